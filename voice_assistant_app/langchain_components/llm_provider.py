@@ -1,39 +1,112 @@
 import os
+import functools
+import importlib.util
+import threading
+import httpx
 from langchain_groq import ChatGroq
-from langchain.schema import SystemMessage, HumanMessage
+from langchain.schema import HumanMessage, AIMessage
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import logging
 from dotenv import load_dotenv
+from schemas import ExtractionSchema
+from langchain_components.prompts import EXTRACTION_TEMPLATE, EXTRACTION_DYNAMIC_TAIL
 
 
 _ = load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Logging is configured by the application entrypoint (main.py)
 logger = logging.getLogger(__name__)
 
+# Rough characters-per-token ratio used to budget the chat history
+CHARS_PER_TOKEN = 4
+
+@functools.lru_cache(maxsize=None)
+def _get_http_client() -> httpx.Client:
+    """
+    Returns the keep-alive HTTP client shared by all Groq calls.
+    HTTP/2 is used when the optional h2 package is installed.
+    """
+    return httpx.Client(
+        http2=importlib.util.find_spec("h2") is not None,
+        timeout=15,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=50)
+    )
+
+@functools.lru_cache(maxsize=1024)
+def _to_message(role: str, content: str):
+    """Returns a shared LangChain message for a chat history entry."""
+    if role == "user":
+        return HumanMessage(content=content)
+    return AIMessage(content=content)
+
 class LLMProvider:
     """
-    Configures and provides access to the Groq LLaMA 70B model via LangChain.
+    Configures and provides access to the Groq LLaMA models via LangChain:
+    70B for user-facing replies and 8B Instant for structured extraction.
     """
     
     def __init__(self):
         """
-        Initialize the LLM provider with Groq's LLaMA 70B model.
+        Initialize the LLM provider with Groq's LLaMA models.
         Requires GROQ_API_KEY environment variable.
         """
         self.model_name = "llama3-70b-8192"
+        self.extract_model_name = "llama-3.1-8b-instant"
+        self._api_key = os.environ.get("GROQ_API_KEY")
         
-        if not os.getenv("GROQ_API_KEY"):
+        if not self._api_key:
             logger.warning("GROQ_API_KEY environment variable not set")
-            
-        self.llm = ChatGroq(
+        
+        # Token budget for the chat history sent with each extraction
+        self._history_budget_tokens = 512
+        
+        # Exact-match cache of extraction results keyed by (field, normalized input);
+        # the provider is shared by every session, so the lock guards all access
+        self._extraction_cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._extraction_cache_size = 256
+        self._extraction_cache_lock = threading.Lock()
+    
+    @functools.cached_property
+    def llm(self) -> ChatGroq:
+        """
+        The Groq chat model used for user-facing replies, constructed on first use.
+        
+        Returns:
+            ChatGroq instance
+        """
+        return ChatGroq(
             model_name=self.model_name,
             temperature=0.7,
-            groq_api_key=os.getenv("GROQ_API_KEY")
+            timeout=15,
+            groq_api_key=self._api_key,
+            http_client=_get_http_client()
+        )
+    
+    @functools.cached_property
+    def extract_llm(self) -> ChatGroq:
+        """
+        The smaller, faster Groq model used for intent and value extraction,
+        constructed on first use.
+        
+        Returns:
+            ChatGroq instance
+        """
+        return ChatGroq(
+            model_name=self.extract_model_name,
+            temperature=0.0,
+            # The extraction reply is a small JSON object, so cap the decode length
+            max_tokens=256,
+            timeout=15,
+            groq_api_key=self._api_key,
+            http_client=_get_http_client()
         )
     
+    @functools.cached_property
+    def _extraction_chain(self):
+        """Extraction chain returning an ExtractionSchema via Groq JSON mode."""
+        return EXTRACTION_TEMPLATE | self.extract_llm.with_structured_output(ExtractionSchema, method="json_mode")
+    
     def create_chain_with_system_prompt(self, system_prompt: str):
         """
         Creates a LangChain chain with a specified system prompt.
@@ -52,6 +125,26 @@ class LLMProvider:
         
         return prompt | self.llm
     
+    def _trim_history(self, chat_history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """
+        Keeps the most recent messages that fit within the history token budget.
+        
+        Args:
+            chat_history: Chat history, oldest message first
+            
+        Returns:
+            The trimmed chat history, oldest message first
+        """
+        trimmed = []
+        budget = self._history_budget_tokens
+        for message in reversed(chat_history[-5:]):  # Only use the last 5 messages for context
+            budget -= len(message["content"]) // CHARS_PER_TOKEN + 1
+            if budget < 0:
+                break
+            trimmed.append(message)
+        trimmed.reverse()
+        return trimmed
+    
     def extract_intent_and_value(self, 
                                user_input: str, 
                                field_name: str, 
@@ -73,59 +166,47 @@ class LLMProvider:
         """
         if chat_history is None:
             chat_history = []
-            
-        system_prompt = f"""
-        You are an AI assistant helping extract structured information from user input.
-        Your task is to identify the user's intent and extract the value for the field: '{field_name}'.
-        
-        Field description: {field_description}
-        Validation rules: {validation_rules}
-        
-        You should return a JSON with the following structure:
-        {{
-            "intent": "provide_value" | "confirm" | "deny" | "request_help" | "request_skip" | "other",
-            "extracted_value": The extracted value (if any) that matches the field type requirements,
-            "confidence": A number between 0 and 1 indicating your confidence in the extraction,
-            "reasoning": Brief explanation of your extraction logic
-        }}
-        
-        If the user is confirming something, set intent to "confirm".
-        If the user is denying or correcting something, set intent to "deny".
-        If the user is asking for help or clarification, set intent to "request_help".
-        If the user wants to skip this field, set intent to "request_skip".
-        If the user is providing a value for the field, set intent to "provide_value" and extract the value.
-        Otherwise, set intent to "other".
         
-        Only extract values that directly relate to the current field ({field_name}).
-        """
+        cache_key = (field_name, user_input.strip().lower())
+        with self._extraction_cache_lock:
+            cached = self._extraction_cache.get(cache_key)
+        if cached is not None:
+            logger.info("LLM extraction cache hit for field %s", field_name)
+            return dict(cached)
+            
+        dynamic_tail = EXTRACTION_DYNAMIC_TAIL.format(
+            field_name=field_name,
+            field_description=field_description,
+            validation_rules=validation_rules
+        )
         
         # Convert chat history to LangChain message format
-        messages = []
-        for message in chat_history[-5:]:  # Only use the last 5 messages for context
-            if message["role"] == "user":
-                messages.append(HumanMessage(content=message["content"]))
-            else:
-                messages.append(SystemMessage(content=message["content"]))
-        
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", system_prompt),
-            *[(msg.type, msg.content) for msg in messages],
-            ("human", user_input)
-        ])
-        
-        chain = prompt | self.llm
+        messages = [
+            _to_message(message["role"], message["content"])
+            for message in self._trim_history(chat_history)
+        ]
         
         try:
-            result = chain.invoke({})
-            logger.info(f"LLM extraction result: {result.content}")
-            # The result should be a JSON string that we can parse
-            # But for simplicity in this example, we'll assume it's already structured properly
-            return result.content
+            result = self._extraction_chain.invoke({
+                "dynamic_tail": dynamic_tail,
+                "chat_history": messages,
+                "input": user_input
+            })
+            logger.info("LLM extraction result: %s", result)
+            extraction = result.model_dump()
         except Exception as e:
-            logger.error(f"Error in LLM extraction: {e}")
+            logger.error("Error in LLM extraction: %s", e)
             return {
                 "intent": "other",
                 "extracted_value": None,
                 "confidence": 0.0,
                 "reasoning": f"Error occurred during extraction: {str(e)}"
-            }
\ No newline at end of file
+            }
+        
+        with self._extraction_cache_lock:
+            # Evict the oldest entry once the cache is full
+            if cache_key not in self._extraction_cache and len(self._extraction_cache) >= self._extraction_cache_size:
+                del self._extraction_cache[next(iter(self._extraction_cache))]
+            self._extraction_cache[cache_key] = extraction
+        
+        return dict(extraction)
\ No newline at end of file
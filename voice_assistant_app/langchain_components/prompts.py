@@ -2,6 +2,8 @@
 Collection of system prompts for different tasks in the application.
 """
 
+from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
+
 # System prompt for the main chatbot assistant
 ASSISTANT_SYSTEM_PROMPT = """
 You are a friendly and helpful voice-controlled assistant designed to guide users through completing a form.
@@ -31,38 +33,73 @@ The form contains 10 fields:
 Always maintain context of which field you're currently working on and what information has already been collected.
 """
 
-# Prompt for extracting field values from user input
-EXTRACTION_SYSTEM_PROMPT = """
-You are an AI data extraction specialist. Your task is to carefully extract structured information from user input for a specific form field.
+# Shared prompt fragments. Prompts are composed static-first so the common
+# instructions form a stable prefix and the per-call field context comes last.
+_JSON_PREAMBLE = """
+Your output should be a JSON object with the following structure:
+"""
 
+_FIELD_CONTEXT = """
 Current field: {field_name}
 Field description: {field_description}
 Field type: {field_type}
 Validation rules: {validation_rules}
+"""
 
-Your output should be a JSON object with the following structure:
-{{
+_EXTRACTION_SCHEMA = """{{
     "intent": "provide_value" | "confirm" | "deny" | "request_help" | "request_skip" | "other",
-    "extracted_value": The extracted value that matches the field requirements (can be null),
+    "extracted_value": The extracted value (if any) that matches the field type requirements,
     "confidence": A number between 0 and 1 indicating your confidence in the extraction,
-    "reason": Brief explanation of your extraction
+    "reasoning": Brief explanation of your extraction logic
 }}
+"""
 
+# Prompt for extracting field values from user input
+EXTRACTION_SYSTEM_PROMPT = "".join([
+    """
+You are an AI data extraction specialist. Your task is to carefully extract structured information from user input for a specific form field.
+""",
+    _JSON_PREAMBLE,
+    _EXTRACTION_SCHEMA,
+    """
 Only extract values that directly relate to the current field. Be precise and follow all validation rules.
+""",
+    _FIELD_CONTEXT
+])
+
+# Static extraction instructions, kept byte-identical across calls so the
+# provider can reuse the cached prompt prefix
+EXTRACTION_PREAMBLE = "".join([
+    """
+You are an AI assistant helping extract structured information from user input.
+Your task is to identify the user's intent and extract the value for the current field.
+""",
+    _JSON_PREAMBLE,
+    _EXTRACTION_SCHEMA,
+    """
+If the user is confirming something, set intent to "confirm".
+If the user is denying or correcting something, set intent to "deny".
+If the user is asking for help or clarification, set intent to "request_help".
+If the user wants to skip this field, set intent to "request_skip".
+If the user is providing a value for the field, set intent to "provide_value" and extract the value.
+Otherwise, set intent to "other".
+
+Only extract values that directly relate to the current field.
 """
+])
 
-# Prompt for validating extracted values
-VALIDATION_SYSTEM_PROMPT = """
-You are an AI data validation specialist. Your task is to validate whether an extracted value meets all requirements for a specific form field.
-
-Current field: {field_name}
+# Field-specific suffix appended after the static preamble
+EXTRACTION_DYNAMIC_TAIL = """Current field: {field_name}
 Field description: {field_description}
-Field type: {field_type}
-Validation rules: {validation_rules}
-Extracted value: {extracted_value}
+Validation rules: {validation_rules}"""
 
-Your output should be a JSON object with the following structure:
-{{
+# Prompt for validating extracted values
+VALIDATION_SYSTEM_PROMPT = "".join([
+    """
+You are an AI data validation specialist. Your task is to validate whether an extracted value meets all requirements for a specific form field.
+""",
+    _JSON_PREAMBLE,
+    """{{
     "is_valid": true | false,
     "error_message": Detailed explanation if invalid (null if valid),
     "suggested_correction": A suggested correction if possible (null if valid or no suggestion),
@@ -70,10 +107,15 @@ Your output should be a JSON object with the following structure:
 }}
 
 Be thorough in your validation and provide helpful error messages when values don't meet requirements.
+""",
+    _FIELD_CONTEXT,
+    """Extracted value: {extracted_value}
 """
+])
 
 # Prompt for the supervisor node
-SUPERVISOR_SYSTEM_PROMPT = """
+SUPERVISOR_SYSTEM_PROMPT = "".join([
+    """
 You are an AI workflow supervisor. Your job is to monitor the form completion process and decide the next appropriate action based on the current state.
 
 Your decisions should follow these rules:
@@ -84,9 +126,9 @@ Your decisions should follow these rules:
 5. If all fields are complete, finalize the form
 6. If the user asks for help, provide detailed guidance for the current field
 7. If the user wants to skip a field and it's optional, allow skipping
-
-Output a JSON object with the following structure:
-{{
+""",
+    _JSON_PREAMBLE,
+    """{{
     "next_node": The name of the next node to execute,
     "reason": Brief explanation of your decision,
     "field_to_process": The field to focus on (if applicable),
@@ -95,20 +137,15 @@ Output a JSON object with the following structure:
 
 Always maintain the flow of the conversation and ensure all required fields are eventually completed.
 """
+])
 
 # Prompt for error handling
-ERROR_HANDLING_SYSTEM_PROMPT = """
+ERROR_HANDLING_SYSTEM_PROMPT = "".join([
+    """
 You are an AI error resolution specialist. Your task is to help users correct invalid input for a form field.
-
-Current field: {field_name}
-Field description: {field_description}
-Field type: {field_type}
-Validation rules: {validation_rules}
-User's invalid input: {user_input}
-Error details: {error_message}
-
-Your output should be a JSON object with the following structure:
-{{
+""",
+    _JSON_PREAMBLE,
+    """{{
     "error_explanation": Clear explanation of why the input is invalid,
     "valid_examples": 2-3 examples of valid inputs for this field,
     "guidance_message": A helpful message to guide the user to provide valid input,
@@ -116,7 +153,12 @@ Your output should be a JSON object with the following structure:
 }}
 
 Be helpful, specific, and clear in your guidance to help the user provide valid information.
+""",
+    _FIELD_CONTEXT,
+    """User's invalid input: {user_input}
+Error details: {error_message}
 """
+])
 
 # Confirmation message template
 CONFIRMATION_TEMPLATE = """I've captured that your {field_name} is: {value}. Is that correct?"""
@@ -131,4 +173,13 @@ Excellent! We've completed all the required information. Here's a summary of wha
 {summary}
 
 Thank you for providing all this information. The form has been submitted successfully.
-"""
\ No newline at end of file
+"""
+
+# Extraction prompt template, built once at import and shared by all callers.
+# Static instructions first, dynamic field context last.
+EXTRACTION_TEMPLATE = ChatPromptTemplate.from_messages([
+    ("system", EXTRACTION_PREAMBLE),
+    ("system", "{dynamic_tail}"),
+    MessagesPlaceholder(variable_name="chat_history"),
+    ("human", "{input}")
+])
\ No newline at end of file
@@ -14,8 +14,7 @@ from .nodes import (
 )
 from .supervisor import supervisor_node
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Logging is configured by the application entrypoint (main.py)
 logger = logging.getLogger(__name__)
 
 class GraphState(TypedDict):
@@ -32,7 +31,7 @@ class GraphState(TypedDict):
     
     # Field tracking
     current_field: str
-    completed_fields: List[str]
+    completed_mask: int
     field_values: Dict[str, Any]
     confirmation_state: bool
     extraction_attempts: int
@@ -53,6 +52,33 @@ class GraphState(TypedDict):
     
     # Messages
     messages: List[Dict[str, str]]
+    
+    # Routing
+    next_node: str
+
+def _route_form_completion(state: GraphState) -> str:
+    """Routes from form_completion_check: END once complete, otherwise back to voice input."""
+    return "END" if state.get("is_complete", False) else "voice_input"
+
+def _route_supervisor(state: GraphState) -> str:
+    """Routes from the supervisor to the node it selected."""
+    return state["next_node"]
+
+# Conditional-edge path maps from routing decision to node name
+_COMPLETION_ROUTES = {
+    "END": "END",  # Form is complete, ending workflow
+    "voice_input": "voice_input"  # Form is not complete, continuing
+}
+
+_SUPERVISOR_ROUTES = {
+    "voice_input": "voice_input",
+    "intent_entity_extraction": "intent_entity_extraction",
+    "input_validation": "input_validation",
+    "error_handling": "error_handling",
+    "field_mapping": "field_mapping",
+    "form_completion_check": "form_completion_check",
+    "END": "END"
+}
 
 def create_workflow() -> StateGraph:
     """
@@ -99,26 +125,15 @@ def create_workflow() -> StateGraph:
     # From form_completion_check to END or back to supervisor
     workflow.add_conditional_edges(
         "form_completion_check",
-        lambda state: "END" if state.get("is_complete", False) else "voice_input",
-        {
-            "END": "Form is complete, ending workflow",
-            "voice_input": "Form is not complete, continuing"
-        }
+        _route_form_completion,
+        _COMPLETION_ROUTES
     )
     
     # Define supervisor conditional edges
     workflow.add_conditional_edges(
         "supervisor",
-        lambda state: state["next_node"],
-        {
-            "voice_input": "Proceeding to voice input",
-            "intent_entity_extraction": "Proceeding to intent/entity extraction",
-            "input_validation": "Proceeding to input validation",
-            "error_handling": "Proceeding to error handling",
-            "field_mapping": "Proceeding to field mapping",
-            "form_completion_check": "Proceeding to form completion check",
-            "END": "Ending workflow"
-        }
+        _route_supervisor,
+        _SUPERVISOR_ROUTES
     )
     
     # Set the entry point
@@ -126,6 +141,46 @@ def create_workflow() -> StateGraph:
     
     return workflow
 
+# Routing functions used by process_user_input; each returns the next node
+# to run, or None once the turn is finished
+def _route_after_voice_input(state: Dict[str, Any]):
+    # Extract intent and entities if transcription was successful
+    return intent_entity_extraction_node if state.get('transcription_success', False) else None
+
+def _route_after_extraction(state: Dict[str, Any]):
+    # If extraction successful, validate
+    if state.get('extraction_success', True):
+        return input_validation_node
+    return _route_to_completion_check(state)
+
+def _route_after_validation(state: Dict[str, Any]):
+    # Handle validation results
+    return field_mapping_node if state.get('validation_success', False) else error_handling_node
+
+def _route_to_completion_check(state: Dict[str, Any]):
+    # Check form completion once the current field has a value
+    if state.get('current_field', None) and state.get('field_values', {}).get(state.get('current_field')):
+        return form_completion_check_node
+    return None
+
+def _route_after_completion_check(state: Dict[str, Any]):
+    # If complete, end the workflow
+    return end_node if state.get('is_complete', False) else None
+
+def _route_to_stop(state: Dict[str, Any]):
+    return None
+
+# Transition table mapping each node to its routing function
+_TRANSITIONS = {
+    voice_input_node: _route_after_voice_input,
+    intent_entity_extraction_node: _route_after_extraction,
+    input_validation_node: _route_after_validation,
+    field_mapping_node: _route_to_completion_check,
+    error_handling_node: _route_to_completion_check,
+    form_completion_check_node: _route_after_completion_check,
+    end_node: _route_to_stop
+}
+
 # Function to process a single user input through the workflow
 def process_user_input(workflow_state: Dict[str, Any], user_input: str) -> Dict[str, Any]:
     """
@@ -138,9 +193,6 @@ def process_user_input(workflow_state: Dict[str, Any], user_input: str) -> Dict[
     Returns:
         Updated workflow state
     """
-    # Create an instance of the workflow graph
-    workflow = create_workflow()
-    
     # Add user input to the state
     state = {**workflow_state, "user_input": user_input}
     
@@ -148,31 +200,11 @@ def process_user_input(workflow_state: Dict[str, Any], user_input: str) -> Dict[
     if not state.get('initialized', False):
         state = start_node(state)
     
-    # Process through the graph nodes manually since we're not using stream
-    # First process voice input
-    state = voice_input_node(state)
-    
-    # Then extract intent and entities if transcription was successful
-    if state.get('transcription_success', False):
-        state = intent_entity_extraction_node(state)
-        
-        # If extraction successful, validate
-        if state.get('extraction_success', True):
-            state = input_validation_node(state)
-            
-            # Handle validation results
-            if state.get('validation_success', False):
-                state = field_mapping_node(state)
-            else:
-                state = error_handling_node(state)
-        
-        # Check form completion
-        if state.get('current_field', None) and state.get('field_values', {}).get(state.get('current_field')):
-            state = form_completion_check_node(state)
-            
-            # If complete, end the workflow
-            if state.get('is_complete', False):
-                state = end_node(state)
+    # Walk the node transition table, starting from voice input
+    node = voice_input_node
+    while node is not None:
+        state = node(state)
+        node = _TRANSITIONS[node](state)
     
     # Return the final state
     return state
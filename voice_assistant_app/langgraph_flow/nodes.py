@@ -1,19 +1,180 @@
 import json
+import functools
+import re
+import string
 from typing import Dict, Any, List, Tuple, Optional
 import logging
 from schemas import UserFormData
-from utils.audio_processor import AudioProcessor
 from langchain_components.llm_provider import LLMProvider
+from langchain_components.prompts import FORM_COMPLETION_TEMPLATE
 from pydantic import ValidationError
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Logging is configured by the application entrypoint (main.py)
 logger = logging.getLogger(__name__)
 
-# Initialize the audio processor and LLM provider
-audio_processor = AudioProcessor()
+# Initialize the LLM provider
 llm_provider = LLMProvider()
 
+# Form schema details, computed once instead of on every node call
+_SCHEMA = UserFormData.model_json_schema()
+_PROPS = _SCHEMA['properties']
+_FIELD_ORDER = list(_PROPS.keys())
+_FIELD_INDEX = {field: i for i, field in enumerate(_FIELD_ORDER)}
+_REQUIRED = frozenset(_SCHEMA.get('required', []))
+
+# One bit per field so completion is a single mask comparison
+_FIELD_BITS = {field: 1 << i for i, field in enumerate(_FIELD_ORDER)}
+_REQUIRED_MASK = sum(_FIELD_BITS[field] for field in _REQUIRED)
+
+# Intent reported when the user supplies a value for the current field
+PROVIDE_VALUE = 'provide_value'
+
+# Schema keys that describe a field rather than constrain it
+_NON_RULE_KEYS = frozenset({'description', 'title', 'type'})
+
+# Words that confirm or deny a captured value; a denial word takes precedence
+_CONFIRM_WORDS = frozenset({"yes", "correct", "right", "sure", "yeah", "yep", "yup", "ok", "okay"})
+_DENY_WORDS = frozenset({"no", "nope", "wrong", "incorrect", "not"})
+
+# Separators between spoken list items, e.g. "web dev and ML; games"
+_INTEREST_SPLIT = re.compile(r'\s*(?:,|;|\band\b)\s*')
+
+# Whole-utterance commands that never need the LLM to classify
+_COMMAND_INTENTS = {
+    "help": "request_help",
+    "help me": "request_help",
+    "i need help": "request_help",
+    "what should i say": "request_help",
+    "skip": "request_skip",
+    "skip it": "request_skip",
+    "skip this": "request_skip",
+    "skip this one": "request_skip",
+    "skip this field": "request_skip",
+}
+
+# Per-field error explanation and valid examples used by error_handling_node
+_FIELD_ERROR_INFO = {
+    'full_name': ("Your name should be between 2 and 100 characters.",
+                  ["John Smith", "Maria Rodriguez", "Ahmed Khan"]),
+    'email': ("Please provide a valid email address.",
+              ["user@example.com", "name.surname@company.co.uk"]),
+    'age': ("Your age should be a number between 18 and 120.",
+            ["30", "45", "62"]),
+    'experience_level': ("Please select one of the valid experience levels.",
+                         ["Beginner", "Intermediate", "Advanced", "Expert"]),
+    'preferred_language': ("Please select one of the valid programming languages.",
+                           ["Python", "JavaScript", "Java", "C++", "Go", "Rust", "Other"]),
+    'project_interests': ("Please provide 1 to 5 project interests.",
+                          ["Web Development", "Machine Learning, Data Analysis", "Game Development, Mobile Apps, Cloud Computing"]),
+    'availability_per_week': ("Please provide a number between 1 and 168 for weekly availability hours.",
+                              ["10", "20", "40"]),
+    'start_date': ("Please provide a valid date in YYYY-MM-DD format.",
+                   ["2025-06-01", "2025-07-15", "2025-08-30"])
+}
+
+# Per-field help messages used when the user asks for help
+_FIELD_HELP = {
+    'full_name': "I need your full name. For example, 'John Smith' or 'Maria Rodriguez'.",
+    'email': "I need a valid email address where you can be contacted. For example, 'user@example.com'.",
+    'age': "Please provide your age as a number between 18 and 120.",
+    'experience_level': "Please select your experience level from: Beginner, Intermediate, Advanced, or Expert.",
+    'preferred_language': "Please select your preferred programming language from: Python, JavaScript, Java, C++, Go, Rust, or Other.",
+    'project_interests': "Please list between 1 and 5 project areas you're interested in. For example, 'Web Development, Machine Learning'.",
+    'availability_per_week': "How many hours per week can you dedicate to the project? Please provide a number between 1 and 168.",
+    'start_date': "When would you like to start? Please provide a date in YYYY-MM-DD format, for example, '2025-06-01'."
+}
+
+# Custom prompts for fields that need more than their description
+_FIELD_PROMPTS = {
+    'experience_level': "Now, please tell me your experience level. Choose from: Beginner, Intermediate, Advanced, or Expert.",
+    'preferred_language': "What's your preferred programming language? Options are: Python, JavaScript, Java, C++, Go, Rust, or Other.",
+    'project_interests': "What projects are you interested in? You can list between 1 and 5 interests.",
+    'start_date': "When would you like to start? Please provide a date in YYYY-MM-DD format."
+}
+
+# Prompt asked when moving to each field, defaulting to the schema description
+_NEXT_FIELD_PROMPT = {
+    field: _FIELD_PROMPTS.get(
+        field, f"Now, please tell me {_PROPS[field].get('description', f'your {field}')}."
+    )
+    for field in _FIELD_ORDER
+}
+
+# Form completion message, without the template's surrounding blank lines
+_COMPLETION_TEMPLATE = FORM_COMPLETION_TEMPLATE.strip()
+
+def _format_value(value: Any) -> str:
+    """Formats a field value for display, joining list items with commas."""
+    return ', '.join(value) if isinstance(value, list) else str(value)
+
+def _format_summary(values: Dict[str, Any]) -> str:
+    """
+    Formats collected field values as a bulleted summary, skipping empty fields.
+    
+    Args:
+        values: Dictionary of field names and their values
+        
+    Returns:
+        Summary string with one "- field: value" line per field
+    """
+    return "\n".join(
+        f"- {field}: {_format_value(value)}"
+        for field, value in values.items()
+        if value is not None
+    )
+
+def _finalize(state: Dict[str, Any]) -> None:
+    """
+    Marks the form complete and adds the completion summary message once.
+    
+    Args:
+        state: Current state of the workflow
+    """
+    state['is_complete'] = True
+    if state.get('completion_message_added', False):
+        return
+    
+    # Create a summary of all collected information
+    summary = _format_summary(state['field_values'])
+    
+    # Add completion message
+    completion_message = _COMPLETION_TEMPLATE.format(summary=summary)
+    state['messages'].append({"role": "assistant", "content": completion_message})
+    state['completion_message_added'] = True
+
+@functools.lru_cache(maxsize=None)
+def _validation_rules(field_name: str) -> Dict[str, Any]:
+    """
+    Returns the validation rules for a field from the form schema.
+    The result is cached and shared, so callers must not modify it.
+    
+    Args:
+        field_name: The name of the field
+        
+    Returns:
+        Dictionary of validation rules for the field
+    """
+    return {
+        k: v for k, v in _PROPS.get(field_name, {}).items()
+        if k not in _NON_RULE_KEYS
+    }
+
+def _validate_field(field_name: str, value: Any) -> None:
+    """
+    Validates a single form field against UserFormData, running only that
+    field's constraints and validators on the model's compiled validator.
+    
+    Args:
+        field_name: The name of the field to validate
+        value: The value to validate
+        
+    Raises:
+        ValidationError: If the value is invalid for the field
+    """
+    UserFormData.__pydantic_validator__.validate_assignment(
+        UserFormData.model_construct(), field_name, value
+    )
+
 def start_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Entry point for the LangGraph workflow.
@@ -24,12 +185,12 @@ def start_node(state: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Updated state with initialization
     """
-    logger.info("Starting workflow")
+    logger.debug("Starting workflow")
     
     if 'initialized' not in state:
         state['initialized'] = True
         state['current_field'] = 'full_name'
-        state['completed_fields'] = []
+        state['completed_mask'] = 0
         state['field_values'] = {}
         state['confirmation_state'] = False
         state['extraction_attempts'] = 0
@@ -52,7 +213,7 @@ def voice_input_node(state: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Updated state with transcribed text
     """
-    logger.info("Processing voice input")
+    logger.debug("Processing voice input")
     
     # This is a placeholder for integrating with frontend
     # In the real implementation, this will be triggered by UI events
@@ -78,6 +239,22 @@ def voice_input_node(state: Dict[str, Any]) -> Dict[str, Any]:
     
     return state
 
+def _record_extraction(state: Dict[str, Any], extraction_result: Dict[str, Any]) -> None:
+    """
+    Stores an extraction result in the state and counts the attempt.
+    
+    Args:
+        state: Current state of the workflow
+        extraction_result: Extracted intent and value
+    """
+    # Store the extraction results in the state
+    state['extraction_result'] = extraction_result
+    state['current_extracted_value'] = extraction_result.get('extracted_value')
+    state['extraction_success'] = True
+    
+    # Increment the extraction attempt counter
+    state['extraction_attempts'] = state.get('extraction_attempts', 0) + 1
+
 def intent_entity_extraction_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Extracts intent and entities from the transcribed text using Groq LLM.
@@ -88,7 +265,7 @@ def intent_entity_extraction_node(state: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Updated state with extracted intent and entities
     """
-    logger.info("Extracting intent and entities")
+    logger.debug("Extracting intent and entities")
     
     # Skip if transcription failed
     if not state.get('transcription_success', False):
@@ -96,67 +273,74 @@ def intent_entity_extraction_node(state: Dict[str, Any]) -> Dict[str, Any]:
         state['extraction_error'] = "Transcription failed"
         return state
     
+    # If we're in confirmation state, we only need to check if the user confirmed or denied
+    if state.get('confirmation_state', False):
+        # Match whole words so e.g. "yesterday" does not count as "yes"
+        tokens = {token.strip(string.punctuation) for token in state['transcribed_text'].lower().split()}
+        is_confirm = bool(tokens & _CONFIRM_WORDS) and not tokens & _DENY_WORDS
+        
+        # Add a special system message for confirmation
+        _record_extraction(state, {
+            "intent": "confirm" if is_confirm else "deny",
+            "extracted_value": state.get('current_extracted_value'),
+            "confidence": 1.0,
+            "reasoning": "Direct confirmation/denial detection"
+        })
+        return state
+    
+    # Repeated help/skip commands are matched exactly instead of sent to the LLM
+    command = " ".join(token.strip(string.punctuation) for token in state['transcribed_text'].lower().split())
+    command_intent = _COMMAND_INTENTS.get(command)
+    if command_intent:
+        _record_extraction(state, {
+            "intent": command_intent,
+            "extracted_value": None,
+            "confidence": 1.0,
+            "reasoning": "Exact command match"
+        })
+        return state
+    
     try:
         # Get the current field details
         current_field = state['current_field']
         
         # Get field details from UserFormData model
-        field_info = UserFormData.model_json_schema()['properties'].get(current_field, {})
+        field_info = _PROPS.get(current_field, {})
         
         # Extract field description and validation rules
         field_description = field_info.get('description', f"The user's {current_field}")
-        validation_rules = {
-            k: v for k, v in field_info.items() 
-            if k not in ['description', 'title', 'type']
-        }
-        
-        # If we're in confirmation state, we need to check if the user confirmed or denied
-        if state.get('confirmation_state', False):
-            # Add a special system message for confirmation
-            extraction_result = {
-                "intent": "confirm" if any(word in state['transcribed_text'].lower() 
-                                          for word in ["yes", "correct", "right", "sure", "yeah", "yep", "yup"]) 
-                                     else "deny",
-                "extracted_value": state.get('current_extracted_value'),
-                "confidence": 1.0,
-                "reasoning": "Direct confirmation/denial detection"
-            }
-        else:
-            # Get chat history for context
-            chat_history = state.get('messages', [])[-5:]  # Last 5 messages
-            
-            # Use LLM to extract intent and value
-            extraction_result = llm_provider.extract_intent_and_value(
-                user_input=state['transcribed_text'],
-                field_name=current_field,
-                field_description=field_description,
-                validation_rules=validation_rules,
-                chat_history=chat_history
-            )
-            
-            # Parse the result if it's a string (depends on LLM provider implementation)
-            if isinstance(extraction_result, str):
-                try:
-                    extraction_result = json.loads(extraction_result)
-                except json.JSONDecodeError:
-                    logger.error(f"Failed to parse LLM result: {extraction_result}")
-                    extraction_result = {
-                        "intent": "other",
-                        "extracted_value": None,
-                        "confidence": 0.0,
-                        "reasoning": "Failed to parse LLM result"
-                    }
-        
-        # Store the extraction results in the state
-        state['extraction_result'] = extraction_result
-        state['current_extracted_value'] = extraction_result.get('extracted_value')
-        state['extraction_success'] = True
-        
-        # Increment the extraction attempt counter
-        state['extraction_attempts'] = state.get('extraction_attempts', 0) + 1
+        validation_rules = _validation_rules(current_field)
+        
+        # Chat history for context; the provider keeps only the most recent
+        # messages that fit its history budget
+        chat_history = state.get('messages', [])
+        
+        # Use LLM to extract intent and value
+        extraction_result = llm_provider.extract_intent_and_value(
+            user_input=state['transcribed_text'],
+            field_name=current_field,
+            field_description=field_description,
+            validation_rules=validation_rules,
+            chat_history=chat_history
+        )
+        
+        # Parse the result if it's a string (depends on LLM provider implementation)
+        if isinstance(extraction_result, str):
+            try:
+                extraction_result = json.loads(extraction_result)
+            except json.JSONDecodeError:
+                logger.error("Failed to parse LLM result: %s", extraction_result)
+                extraction_result = {
+                    "intent": "other",
+                    "extracted_value": None,
+                    "confidence": 0.0,
+                    "reasoning": "Failed to parse LLM result"
+                }
+        
+        _record_extraction(state, extraction_result)
         
     except Exception as e:
-        logger.error(f"Error in intent/entity extraction: {e}")
+        logger.error("Error in intent/entity extraction: %s", e)
         state['extraction_success'] = False
         state['extraction_error'] = str(e)
     
@@ -172,7 +356,7 @@ def input_validation_node(state: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Updated state with validation results
     """
-    logger.info("Validating input")
+    logger.debug("Validating input")
     
     # Skip if extraction failed
     if not state.get('extraction_success', False):
@@ -181,7 +365,7 @@ def input_validation_node(state: Dict[str, Any]) -> Dict[str, Any]:
         return state
     
     # Skip validation if the intent is not to provide a value
-    if state.get('extraction_result', {}).get('intent') != 'provide_value' and not state.get('confirmation_state', False):
+    if state.get('extraction_result', {}).get('intent') != PROVIDE_VALUE and not state.get('confirmation_state', False):
         state['validation_success'] = True
         state['validation_error'] = None
         return state
@@ -196,25 +380,17 @@ def input_validation_node(state: Dict[str, Any]) -> Dict[str, Any]:
             state['validation_error'] = "No value was extracted"
             return state
         
-        # Create a temporary dict with just the current field to validate
-        temp_data = {current_field: extracted_value}
+        # Coerce once (e.g. "web dev and ML" to a list) and keep the result,
+        # so the confirmation prompt and the saved value match what passed
+        coercer = _FIELD_COERCERS.get(current_field)
+        if coercer:
+            extracted_value = coercer(extracted_value)
+            state['current_extracted_value'] = extracted_value
         
         # Use Pydantic to validate
         try:
-            # Get existing values for context
-            full_data = {**state.get('field_values', {}), **temp_data}
-            
-            # Validate just the single field
-            field_schema = {
-                'type': 'object',
-                'properties': {
-                    current_field: UserFormData.model_json_schema()['properties'][current_field]
-                },
-                'required': [current_field]
-            }
-            
-            # We're using the model's validators for the specific field
-            UserFormData(**full_data).model_dump()
+            # Validate just the current field with the model's validators
+            _validate_field(current_field, extracted_value)
             
             # If no exception was raised, validation passed
             state['validation_success'] = True
@@ -226,7 +402,7 @@ def input_validation_node(state: Dict[str, Any]) -> Dict[str, Any]:
             state['validation_error'] = str(ve)
             
             # Get field details from UserFormData model
-            field_info = UserFormData.model_json_schema()['properties'].get(current_field, {})
+            field_info = _PROPS.get(current_field, {})
             
             # Add helpful information for the error handling node
             if 'enum' in field_info:
@@ -235,7 +411,7 @@ def input_validation_node(state: Dict[str, Any]) -> Dict[str, Any]:
                 state['valid_options'] = "A list of 1-5 project interests, each between 2-100 characters"
             
     except Exception as e:
-        logger.error(f"Error in validation: {e}")
+        logger.error("Error in validation: %s", e)
         state['validation_success'] = False
         state['validation_error'] = str(e)
     
@@ -251,7 +427,7 @@ def error_handling_node(state: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Updated state with error handling results
     """
-    logger.info("Handling errors")
+    logger.debug("Handling errors")
     
     # Only process if validation failed
     if state.get('validation_success', True):
@@ -259,38 +435,15 @@ def error_handling_node(state: Dict[str, Any]) -> Dict[str, Any]:
     
     try:
         current_field = state['current_field']
-        field_info = UserFormData.model_json_schema()['properties'].get(current_field, {})
+        field_info = _PROPS.get(current_field, {})
         field_description = field_info.get('description', f"The user's {current_field}")
         error_message = state.get('validation_error', "Invalid input")
         
-        # Create error message based on field type and validation rules
-        if current_field == 'full_name':
-            error_explanation = "Your name should be between 2 and 100 characters."
-            valid_examples = ["John Smith", "Maria Rodriguez", "Ahmed Khan"]
-        elif current_field == 'email':
-            error_explanation = "Please provide a valid email address."
-            valid_examples = ["user@example.com", "name.surname@company.co.uk"]
-        elif current_field == 'age':
-            error_explanation = "Your age should be a number between 18 and 120."
-            valid_examples = ["30", "45", "62"]
-        elif current_field == 'experience_level':
-            error_explanation = "Please select one of the valid experience levels."
-            valid_examples = ["Beginner", "Intermediate", "Advanced", "Expert"]
-        elif current_field == 'preferred_language':
-            error_explanation = "Please select one of the valid programming languages."
-            valid_examples = ["Python", "JavaScript", "Java", "C++", "Go", "Rust", "Other"]
-        elif current_field == 'project_interests':
-            error_explanation = "Please provide 1 to 5 project interests."
-            valid_examples = ["Web Development", "Machine Learning, Data Analysis", "Game Development, Mobile Apps, Cloud Computing"]
-        elif current_field == 'availability_per_week':
-            error_explanation = "Please provide a number between 1 and 168 for weekly availability hours."
-            valid_examples = ["10", "20", "40"]
-        elif current_field == 'start_date':
-            error_explanation = "Please provide a valid date in YYYY-MM-DD format."
-            valid_examples = ["2025-06-01", "2025-07-15", "2025-08-30"]
-        else:
-            error_explanation = f"The provided value for {current_field} is invalid."
-            valid_examples = ["Please check the requirements and try again."]
+        # Look up the error message based on field type and validation rules
+        error_explanation, valid_examples = _FIELD_ERROR_INFO.get(
+            current_field,
+            (f"The provided value for {current_field} is invalid.", ["Please check the requirements and try again."])
+        )
         
         # Customize error message based on field
         guidance_message = f"I'm having trouble understanding your {current_field}. {error_explanation} Could you please try again?"
@@ -310,7 +463,7 @@ def error_handling_node(state: Dict[str, Any]) -> Dict[str, Any]:
             state['confirmation_state'] = False
         
     except Exception as e:
-        logger.error(f"Error in error handling: {e}")
+        logger.error("Error in error handling: %s", e)
         # Fallback error message
         state['messages'].append({
             "role": "assistant", 
@@ -319,6 +472,153 @@ def error_handling_node(state: Dict[str, Any]) -> Dict[str, Any]:
     
     return state
 
+def _to_int_safe(value: Any) -> Any:
+    """Converts a value to int, keeping it as is if conversion fails."""
+    if isinstance(value, int):
+        return value
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return value
+
+def _split_csv(value: Any) -> Any:
+    """Converts a string separated by commas, semicolons or "and" to a list of items."""
+    if isinstance(value, str):
+        return [item for item in _INTEREST_SPLIT.split(value.strip()) if item]
+    return value
+
+# Per-field conversions applied to an extracted value before it is validated
+_FIELD_COERCERS = {
+    'age': _to_int_safe,
+    'project_interests': _split_csv,
+    'availability_per_week': _to_int_safe
+}
+
+def _mark_completed(state: Dict[str, Any], field: str) -> None:
+    """Records a field as completed in the completion mask."""
+    state['completed_mask'] = state.get('completed_mask', 0) | _FIELD_BITS[field]
+
+def _handle_confirm(state: Dict[str, Any], current_field: str) -> None:
+    """Stores a confirmed value and moves on to the next field."""
+    if not state.get('confirmation_state', False):
+        return
+    
+    # Store the confirmed value, already coerced by input_validation_node
+    extracted_value = state.get('current_extracted_value')
+    
+    if extracted_value is not None:
+        # Add to field values
+        state['field_values'][current_field] = extracted_value
+        
+        # Log the mapping
+        logger.info("Mapped field %s to value: %s", current_field, extracted_value)
+        
+        # Add to completed fields if not already there
+        _mark_completed(state, current_field)
+        
+        # Add a confirmation message
+        confirmation_message = f"Great! I've saved your {current_field}: {_format_value(extracted_value)}"
+        state['messages'].append({"role": "assistant", "content": confirmation_message})
+        
+        # Reset confirmation state and move to the next field
+        state['confirmation_state'] = False
+        
+        # Determine the next field
+        current_index = _FIELD_INDEX[current_field]
+        
+        if current_index < len(_FIELD_ORDER) - 1:
+            next_field = _FIELD_ORDER[current_index + 1]
+            state['current_field'] = next_field
+            
+            # Add a prompt for the next field
+            state['messages'].append({"role": "assistant", "content": _NEXT_FIELD_PROMPT[next_field]})
+            state['extraction_attempts'] = 0
+        else:
+            # All fields complete
+            _finalize(state)
+
+def _handle_deny(state: Dict[str, Any], current_field: str) -> None:
+    """Discards a denied value and asks for the field again."""
+    if not state.get('confirmation_state', False):
+        return
+    
+    # Reset confirmation state and ask again
+    state['confirmation_state'] = False
+    state['extraction_attempts'] = 0
+    
+    # Add a message asking for the correct value
+    retry_message = f"I apologize for the misunderstanding. Let's try again. What is your {current_field}?"
+    state['messages'].append({"role": "assistant", "content": retry_message})
+
+def _handle_provide_value(state: Dict[str, Any], current_field: str) -> None:
+    """Asks the user to confirm a provided value that passed validation."""
+    if not state.get('validation_success', False):
+        return
+    
+    # Move to confirmation state
+    state['confirmation_state'] = True
+    extracted_value = state.get('current_extracted_value')
+    
+    # Add a confirmation prompt
+    confirmation_message = f"I've captured that your {current_field} is: {_format_value(extracted_value)}. Is that correct?"
+    state['messages'].append({"role": "assistant", "content": confirmation_message})
+
+def _handle_help(state: Dict[str, Any], current_field: str) -> None:
+    """Explains what is needed for the current field."""
+    field_info = _PROPS.get(current_field, {})
+    field_description = field_info.get('description', f"your {current_field}")
+    
+    # Provide help based on the field
+    help_message = _FIELD_HELP.get(
+        current_field,
+        f"I need information about {field_description}. Could you please provide that?"
+    )
+    
+    state['messages'].append({"role": "assistant", "content": help_message})
+
+def _handle_skip(state: Dict[str, Any], current_field: str) -> None:
+    """Skips the current field if it is optional."""
+    # Check if the field is optional
+    can_skip = current_field not in _REQUIRED or current_field == 'additional_notes'
+    
+    if can_skip:
+        # Field is optional, allow skipping
+        state['field_values'][current_field] = None
+        
+        # Add to completed fields
+        _mark_completed(state, current_field)
+        
+        # Add a skip confirmation message
+        skip_message = f"No problem, we can skip the {current_field} field."
+        state['messages'].append({"role": "assistant", "content": skip_message})
+        
+        # Move to the next field
+        current_index = _FIELD_INDEX[current_field]
+        
+        if current_index < len(_FIELD_ORDER) - 1:
+            next_field = _FIELD_ORDER[current_index + 1]
+            state['current_field'] = next_field
+            
+            # Add a prompt for the next field
+            state['messages'].append({"role": "assistant", "content": _NEXT_FIELD_PROMPT[next_field]})
+            state['extraction_attempts'] = 0
+        else:
+            # All fields complete
+            _finalize(state)
+    else:
+        # Field is required, cannot skip
+        cannot_skip_message = f"I'm sorry, but {current_field} is a required field and cannot be skipped. Could you please provide this information?"
+        state['messages'].append({"role": "assistant", "content": cannot_skip_message})
+
+# Intent handlers used by field_mapping_node
+_INTENT_HANDLERS = {
+    'confirm': _handle_confirm,
+    'deny': _handle_deny,
+    PROVIDE_VALUE: _handle_provide_value,
+    'request_help': _handle_help,
+    'request_skip': _handle_skip
+}
+
 def field_mapping_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Maps validated data to form fields and updates state.
@@ -329,195 +629,24 @@ def field_mapping_node(state: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Updated state with mapped field values
     """
-    logger.info("Mapping fields")
+    logger.debug("Mapping fields")
+    
+    intent = state.get('extraction_result', {}).get('intent')
+    
+    # Nothing to map for intents without a handler (e.g. "other")
+    handler = _INTENT_HANDLERS.get(intent)
+    if handler is None:
+        return state
     
     # Only process if validation succeeded or we're handling non-value intents
-    if not state.get('validation_success', False) and state.get('extraction_result', {}).get('intent') == 'provide_value':
+    if not state.get('validation_success', False) and intent == PROVIDE_VALUE:
         return state
     
     try:
-        current_field = state['current_field']
-        intent = state.get('extraction_result', {}).get('intent')
-        
-        # If user confirmed a value
-        if intent == 'confirm' and state.get('confirmation_state', False):
-            # Store the confirmed value
-            extracted_value = state.get('current_extracted_value')
-            
-            if extracted_value is not None:
-                # Special handling for different field types
-                if current_field == 'age' and not isinstance(extracted_value, int):
-                    try:
-                        extracted_value = int(extracted_value)
-                    except (ValueError, TypeError):
-                        # If conversion fails, keep as is
-                        pass
-                        
-                elif current_field == 'project_interests' and isinstance(extracted_value, str):
-                    # Convert comma-separated string to list
-                    extracted_value = [item.strip() for item in extracted_value.split(',')]
-                    
-                elif current_field == 'availability_per_week' and not isinstance(extracted_value, int):
-                    try:
-                        extracted_value = int(extracted_value)
-                    except (ValueError, TypeError):
-                        # If conversion fails, keep as is
-                        pass
-                
-                # Add to field values
-                state['field_values'][current_field] = extracted_value
-                
-                # Log the mapping
-                logger.info(f"Mapped field {current_field} to value: {extracted_value}")
-                
-                # Add to completed fields if not already there
-                if current_field not in state.get('completed_fields', []):
-                    state['completed_fields'] = state.get('completed_fields', []) + [current_field]
-                
-                # Add a confirmation message
-                confirmation_message = f"Great! I've saved your {current_field}: {extracted_value}"
-                state['messages'].append({"role": "assistant", "content": confirmation_message})
-                
-                # Reset confirmation state and move to the next field
-                state['confirmation_state'] = False
-                
-                # Determine the next field
-                field_order = list(UserFormData.model_json_schema()['properties'].keys())
-                current_index = field_order.index(current_field)
-                
-                if current_index < len(field_order) - 1:
-                    next_field = field_order[current_index + 1]
-                    state['current_field'] = next_field
-                    
-                    # Add a prompt for the next field
-                    field_info = UserFormData.model_json_schema()['properties'].get(next_field, {})
-                    field_description = field_info.get('description', f"your {next_field}")
-                    
-                    # Customize prompt based on field type
-                    if next_field == 'experience_level':
-                        prompt = f"Now, please tell me your experience level. Choose from: Beginner, Intermediate, Advanced, or Expert."
-                    elif next_field == 'preferred_language':
-                        prompt = f"What's your preferred programming language? Options are: Python, JavaScript, Java, C++, Go, Rust, or Other."
-                    elif next_field == 'project_interests':
-                        prompt = f"What projects are you interested in? You can list between 1 and 5 interests."
-                    elif next_field == 'start_date':
-                        prompt = f"When would you like to start? Please provide a date in YYYY-MM-DD format."
-                    else:
-                        prompt = f"Now, please tell me {field_description}."
-                    
-                    state['messages'].append({"role": "assistant", "content": prompt})
-                    state['extraction_attempts'] = 0
-                else:
-                    # All fields complete
-                    state['is_complete'] = True
-                    
-                    # Create a summary of all collected information
-                    summary = "\n".join([f"- {field}: {value}" for field, value in state['field_values'].items()])
-                    
-                    # Add completion message
-                    completion_message = f"Excellent! We've completed all the required information. Here's a summary of what you've provided:\n\n{summary}\n\nThank you for providing all this information. The form has been submitted successfully."
-                    state['messages'].append({"role": "assistant", "content": completion_message})
-            
-        # Rest of the function remains the same...
-        # ...
-
-        # If user denied a value
-        elif intent == 'deny' and state.get('confirmation_state', False):
-            # Reset confirmation state and ask again
-            state['confirmation_state'] = False
-            state['extraction_attempts'] = 0
-            
-            # Add a message asking for the correct value
-            retry_message = f"I apologize for the misunderstanding. Let's try again. What is your {current_field}?"
-            state['messages'].append({"role": "assistant", "content": retry_message})
-        
-        # If user provided a value and it passed validation
-        elif intent == 'provide_value' and state.get('validation_success', False):
-            # Move to confirmation state
-            state['confirmation_state'] = True
-            extracted_value = state.get('current_extracted_value')
-            
-            # Add a confirmation prompt
-            confirmation_message = f"I've captured that your {current_field} is: {extracted_value}. Is that correct?"
-            state['messages'].append({"role": "assistant", "content": confirmation_message})
-        
-        # If user requested help
-        elif intent == 'request_help':
-            field_info = UserFormData.model_json_schema()['properties'].get(current_field, {})
-            field_description = field_info.get('description', f"your {current_field}")
-            
-            # Provide help based on the field
-            if current_field == 'full_name':
-                help_message = "I need your full name. For example, 'John Smith' or 'Maria Rodriguez'."
-            elif current_field == 'email':
-                help_message = "I need a valid email address where you can be contacted. For example, 'user@example.com'."
-            elif current_field == 'age':
-                help_message = "Please provide your age as a number between 18 and 120."
-            elif current_field == 'experience_level':
-                help_message = "Please select your experience level from: Beginner, Intermediate, Advanced, or Expert."
-            elif current_field == 'preferred_language':
-                help_message = "Please select your preferred programming language from: Python, JavaScript, Java, C++, Go, Rust, or Other."
-            elif current_field == 'project_interests':
-                help_message = "Please list between 1 and 5 project areas you're interested in. For example, 'Web Development, Machine Learning'."
-            elif current_field == 'availability_per_week':
-                help_message = "How many hours per week can you dedicate to the project? Please provide a number between 1 and 168."
-            elif current_field == 'start_date':
-                help_message = "When would you like to start? Please provide a date in YYYY-MM-DD format, for example, '2025-06-01'."
-            else:
-                help_message = f"I need information about {field_description}. Could you please provide that?"
-            
-            state['messages'].append({"role": "assistant", "content": help_message})
-        
-        # If user requested to skip
-        elif intent == 'request_skip':
-            # Check if the field is optional
-            field_info = UserFormData.model_json_schema()
-            required_fields = field_info.get('required', [])
-            
-            if current_field not in required_fields or current_field == 'additional_notes':
-                # Field is optional, allow skipping
-                state['field_values'][current_field] = None
-                
-                # Add to completed fields
-                if current_field not in state.get('completed_fields', []):
-                    state['completed_fields'] = state.get('completed_fields', []) + [current_field]
-                
-                # Add a skip confirmation message
-                skip_message = f"No problem, we can skip the {current_field} field."
-                state['messages'].append({"role": "assistant", "content": skip_message})
-                
-                # Move to the next field
-                field_order = list(UserFormData.model_json_schema()['properties'].keys())
-                current_index = field_order.index(current_field)
-                
-                if current_index < len(field_order) - 1:
-                    next_field = field_order[current_index + 1]
-                    state['current_field'] = next_field
-                    
-                    # Add a prompt for the next field
-                    next_field_info = UserFormData.model_json_schema()['properties'].get(next_field, {})
-                    next_field_description = next_field_info.get('description', f"your {next_field}")
-                    prompt = f"Now, please tell me {next_field_description}."
-                    
-                    state['messages'].append({"role": "assistant", "content": prompt})
-                    state['extraction_attempts'] = 0
-                else:
-                    # All fields complete
-                    state['is_complete'] = True
-                    
-                    # Create a summary of all collected information
-                    summary = "\n".join([f"- {field}: {value}" for field, value in state['field_values'].items() if value is not None])
-                    
-                    # Add completion message
-                    completion_message = f"Excellent! We've completed all the required information. Here's a summary of what you've provided:\n\n{summary}\n\nThank you for providing all this information. The form has been submitted successfully."
-                    state['messages'].append({"role": "assistant", "content": completion_message})
-            else:
-                # Field is required, cannot skip
-                cannot_skip_message = f"I'm sorry, but {current_field} is a required field and cannot be skipped. Could you please provide this information?"
-                state['messages'].append({"role": "assistant", "content": cannot_skip_message})
+        handler(state, state['current_field'])
     
     except Exception as e:
-        logger.error(f"Error in field mapping: {e}")
+        logger.error("Error in field mapping: %s", e)
         # Fallback error message
         state['messages'].append({
             "role": "assistant", 
@@ -536,19 +665,21 @@ def form_completion_check_node(state: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Updated state with form completion status
     """
-    logger.info("Checking form completion")
+    logger.debug("Checking form completion")
     
     try:
-        # Get all required fields from UserFormData
-        schema = UserFormData.model_json_schema()
-        required_fields = schema.get('required', [])
-        
         # Check if all required fields have values
-        completed_fields = state.get('completed_fields', [])
-        is_complete = all(field in completed_fields for field in required_fields)
+        completed_mask = state.get('completed_mask', 0)
+        is_complete = completed_mask & _REQUIRED_MASK == _REQUIRED_MASK
         
         state['is_complete'] = is_complete
         
+        # Record which required fields are still missing, in form order
+        state['missing_fields'] = [
+            field for field in _FIELD_ORDER
+            if _REQUIRED_MASK & _FIELD_BITS[field] and not completed_mask & _FIELD_BITS[field]
+        ]
+        
         # If complete, prepare final JSON output
         if is_complete:
             # Get all field values
@@ -562,25 +693,11 @@ def form_completion_check_node(state: Dict[str, Any]) -> Dict[str, Any]:
             
             state['final_output'] = final_output
             
-            # If this is the first time completion is detected, add a completion message
-            if not state.get('completion_message_added', False):
-                # Generate a summary of all collected information
-                summary_items = []
-                for field, value in final_output.items():
-                    if field == 'project_interests' and isinstance(value, list):
-                        summary_items.append(f"- {field}: {', '.join(value)}")
-                    else:
-                        summary_items.append(f"- {field}: {value}")
-                
-                summary = "\n".join(summary_items)
-                
-                # Add completion message
-                completion_message = f"Excellent! We've completed all the required information. Here's a summary of what you've provided:\n\n{summary}\n\nThank you for providing all this information. The form has been submitted successfully."
-                state['messages'].append({"role": "assistant", "content": completion_message})
-                state['completion_message_added'] = True
+            # Add the completion message if it hasn't been added yet
+            _finalize(state)
     
     except Exception as e:
-        logger.error(f"Error in form completion check: {e}")
+        logger.error("Error in form completion check: %s", e)
     
     return state
 
@@ -594,7 +711,7 @@ def end_node(state: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Final state
     """
-    logger.info("Ending workflow")
+    logger.debug("Ending workflow")
     
     # Add any final cleanup or processing here
     state['workflow_complete'] = True
@@ -1,14 +1,61 @@
-from typing import Dict, Any, List, Literal, TypedDict
+from itertools import product
+from typing import Dict, Any, List, Literal, Optional, Tuple, TypedDict
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Logging is configured by the application entrypoint (main.py)
 logger = logging.getLogger(__name__)
 
 class SupervisorOutput(TypedDict):
     """Output model for the supervisor node."""
     next_node: str
 
+_INTENTS = ('provide_value', 'confirm', 'deny', 'request_help', 'request_skip', 'other')
+
+def _decide(intent: str, validation_success: Optional[bool], confirmation_state: bool,
+            transcription_failed: bool, extraction_failed: bool, has_transcript: bool) -> str:
+    """
+    Picks the next node for one combination of state bits.
+    
+    Args:
+        intent: Extracted intent, or 'other'
+        validation_success: Validation outcome, or None if validation has not run
+        confirmation_state: Whether a confirmation is pending
+        transcription_failed: Whether transcription explicitly failed
+        extraction_failed: Whether intent extraction explicitly failed
+        has_transcript: Whether a successfully transcribed text is present
+        
+    Returns:
+        Name of the next node
+    """
+    # Check if we need to handle a validation error
+    if validation_success is False and intent == 'provide_value':
+        return "error_handling"
+    
+    if intent == 'provide_value' and validation_success:
+        # If we've validated a provided value, move to field mapping
+        return "field_mapping"
+    elif intent in ('confirm', 'deny') and confirmation_state:
+        # If we're in confirmation state and got a confirm/deny response
+        return "field_mapping"
+    elif intent in ('request_help', 'request_skip'):
+        # Handle help or skip requests
+        return "field_mapping"
+    elif transcription_failed:
+        # If transcription failed
+        return "voice_input"
+    elif extraction_failed:
+        # If extraction failed
+        return "intent_entity_extraction"
+    else:
+        # Default path: process input normally
+        return "intent_entity_extraction" if has_transcript else "voice_input"
+
+# Every combination of state bits resolved once at import
+_ROUTE_TABLE: Dict[Tuple, str] = {
+    key: _decide(*key)
+    for key in product(_INTENTS, (True, False, None), (True, False), (True, False), (True, False), (True, False))
+}
+
 def supervisor_node(state: Dict[str, Any]) -> SupervisorOutput:
     """
     Supervisor node that determines the next step in the workflow based on the current state.
@@ -25,31 +72,18 @@ def supervisor_node(state: Dict[str, Any]) -> SupervisorOutput:
     if state.get('is_complete', False):
         return {"next_node": "form_completion_check"}
     
-    # Check if we need to handle a validation error
-    if state.get('validation_success', True) is False and state.get('extraction_result', {}).get('intent') == 'provide_value':
-        return {"next_node": "error_handling"}
-    
-    # Handle different intents
-    intent = state.get('extraction_result', {}).get('intent', 'other')
+    intent = (state.get('extraction_result') or {}).get('intent', 'other')
+    if intent not in _INTENTS:
+        intent = 'other'
     
-    if intent == 'provide_value' and state.get('validation_success', False):
-        # If we've validated a provided value, move to field mapping
-        return {"next_node": "field_mapping"}
-    elif intent in ['confirm', 'deny'] and state.get('confirmation_state', False):
-        # If we're in confirmation state and got a confirm/deny response
-        return {"next_node": "field_mapping"}
-    elif intent in ['request_help', 'request_skip']:
-        # Handle help or skip requests
-        return {"next_node": "field_mapping"}
-    elif state.get('transcription_success', False) is False:
-        # If transcription failed
-        return {"next_node": "voice_input"}
-    elif state.get('extraction_success', False) is False:
-        # If extraction failed
-        return {"next_node": "intent_entity_extraction"}
-    else:
-        # Default path: process input normally
-        if 'transcribed_text' in state and state.get('transcription_success', False):
-            return {"next_node": "intent_entity_extraction"}
-        else:
-            return {"next_node": "voice_input"}
\ No newline at end of file
+    validation_success = state.get('validation_success')
+    transcription_success = state.get('transcription_success', False)
+    key = (
+        intent,
+        False if validation_success is False else (True if validation_success else None),
+        bool(state.get('confirmation_state', False)),
+        transcription_success is False,
+        state.get('extraction_success', False) is False,
+        bool('transcribed_text' in state and transcription_success),
+    )
+    return {"next_node": _ROUTE_TABLE[key]}
\ No newline at end of file
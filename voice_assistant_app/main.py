@@ -1,16 +1,15 @@
 import streamlit as st
 import json
 import os
-from datetime import datetime
-from typing import Dict, Any, List, Optional
+from datetime import date
+from typing import Dict, Any, List, Optional, Callable
 import logging
 from dotenv import load_dotenv
 
 # Import custom modules
 from schemas import UserFormData
 from utils.audio_processor import AudioProcessor
-from utils.state_manager import StateManager
-from langgraph_flow.graph import process_user_input, get_initial_greeting
+from utils.state_manager import StateManager, build_message_html
 
 # Load environment variables
 load_dotenv()
@@ -19,9 +18,6 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize the audio processor
-audio_processor = AudioProcessor()
-
 # Page configuration
 st.set_page_config(
     page_title="Voice-Controlled Form Assistant",
@@ -31,7 +27,7 @@ st.set_page_config(
 )
 
 # CSS for styling the chat interface
-st.markdown("""
+_CSS = """
 <style>
     /* Main containers */
     .main {
@@ -190,27 +186,72 @@ st.markdown("""
         to { transform: rotate(360deg); }
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+@st.cache_resource
+def _inject_css():
+    """Emit the app stylesheet; Streamlit replays the cached element on reruns."""
+    st.markdown(_CSS, unsafe_allow_html=True)
+
+# Fallback select options if the schema does not list them
+EXPERIENCE_OPTIONS = ("Beginner", "Intermediate", "Advanced", "Expert")
+LANGUAGE_OPTIONS = ("Python", "JavaScript", "Java", "C++", "Go", "Rust", "Other")
+
+# Seconds between checks on a background transcription
+TRANSCRIPTION_POLL_SECONDS = 0.25
 
-def render_chat_message(message: Dict[str, str]):
+@st.cache_resource
+def get_form_schema():
     """
-    Renders a single chat message with appropriate styling.
+    Returns the form field properties and required fields from the Pydantic model.
+    Cached so the schema is built once rather than on every Streamlit rerun.
+    
+    Returns:
+        Tuple of (properties dict, frozenset of required field names)
+    """
+    form_schema = UserFormData.model_json_schema()
+    return form_schema.get('properties', {}), frozenset(form_schema.get('required', []))
+
+@st.cache_resource(show_spinner=False)
+def get_audio_processor():
+    """Creates the audio processor once per process instead of on every rerun."""
+    return AudioProcessor()
+
+@st.cache_resource(show_spinner=False)
+def get_device_options():
+    """
+    Enumerates audio input devices once per process.
+    
+    Returns:
+        Tuple of (selectbox labels, mapping of label to device index)
+    """
+    # Create a list of options for the selectbox
+    device_options = [{"label": "Default Microphone", "value": "default"}]
+    device_options.extend([
+        {"label": f"{device['name']}", "value": device['index']}
+        for device in get_audio_processor().get_available_devices()
+    ])
+    
+    # Create a dictionary mapping labels to values for easier lookup
+    device_map = {item["label"]: item["value"] for item in device_options}
+    return [item["label"] for item in device_options], device_map
+
+def refresh_devices():
+    """Drops every cached device list so the next run re-enumerates microphones."""
+    get_audio_processor().refresh_devices()
+    get_device_options.clear()
+
+def chat_message_html(message: Dict[str, str]) -> str:
+    """
+    Returns the styled HTML for a single chat message.
     
     Args:
         message: Dictionary with 'role' and 'content' keys
     """
-    role = message.get('role', 'assistant')
-    content = message.get('content', '')
-    
-    if role == 'user':
-        st.markdown(f'<div class="user-message">{content}</div>', unsafe_allow_html=True)
-    elif 'No speech detected' in content:
-        # Special styling for speech detection errors
-        st.markdown(f'<div class="error-message speech-error">{content}</div>', unsafe_allow_html=True)
-    elif role == 'error' or 'Voice input error' in content:
-        st.markdown(f'<div class="error-message">{content}</div>', unsafe_allow_html=True)
-    else:
-        st.markdown(f'<div class="assistant-message">{content}</div>', unsafe_allow_html=True)
+    block = message.get('_html')
+    if block is None:
+        block = build_message_html(message.get('role', 'assistant'), message.get('content', ''))
+    return block
 
 def render_chat_interface(on_submit=None):
     """
@@ -238,8 +279,11 @@ def render_chat_interface(on_submit=None):
     # Render chat messages
     chat_placeholder = st.empty()
     with chat_placeholder.container():
-        for message in st.session_state.chat_messages:
-            render_chat_message(message)
+        # One element for the whole history instead of one per message
+        st.markdown(
+            "".join(chat_message_html(message) for message in st.session_state.chat_messages),
+            unsafe_allow_html=True
+        )
     
     st.markdown('</div>', unsafe_allow_html=True)
     
@@ -263,10 +307,13 @@ def render_chat_interface(on_submit=None):
             user_input = st.text_input("", key="user_text_input", label_visibility="collapsed")
     
     with col2:
-        if st.button("🎤", key="voice_button"):
-            # Set listening state to true to show indicator
-            StateManager.set_listening_state(True)
-            st.rerun()  # Rerun to show the listening indicator
+        # The callback runs before the script, so this run already shows the indicator
+        st.button(
+            "🎤",
+            key="voice_button",
+            on_click=StateManager.set_listening_state,
+            args=(True,)
+        )
     
     st.markdown('</div>', unsafe_allow_html=True)
     
@@ -275,6 +322,99 @@ def render_chat_interface(on_submit=None):
     
     return user_input
 
+def _text_input_renderer(label: str):
+    """Build a renderer for a read-only single-line text field."""
+    def render(field_name: str, field_value: Any, field_info: dict):
+        st.text_input(
+            label, 
+            value=field_value if field_value else "",
+            key=f"form_{field_name}",
+            disabled=True
+        )
+    return render
+
+def _number_input_renderer(label: str, min_value: int, max_value: int):
+    """Build a renderer for a read-only bounded number field."""
+    def render(field_name: str, field_value: Any, field_info: dict):
+        st.number_input(
+            label, 
+            min_value=min_value, 
+            max_value=max_value,
+            value=field_value if field_value else min_value,
+            key=f"form_{field_name}",
+            disabled=True
+        )
+    return render
+
+def _selectbox_renderer(label: str, default_options: tuple):
+    """Build a renderer for a read-only choice field."""
+    def render(field_name: str, field_value: Any, field_info: dict):
+        options = field_info.get('enum', default_options)
+        st.selectbox(
+            label, 
+            options=options,
+            index=options.index(field_value) if field_value in options else 0,
+            key=f"form_{field_name}",
+            disabled=True
+        )
+    return render
+
+def _render_project_interests(field_name: str, field_value: Any, field_info: dict):
+    """Render the project interests list as comma-separated text."""
+    if field_value and isinstance(field_value, list):
+        interests_text = ", ".join(field_value)
+    else:
+        interests_text = ""
+    st.text_area(
+        "Project Interests", 
+        value=interests_text,
+        key=f"form_{field_name}",
+        disabled=True,
+        help="Enter interests separated by commas"
+    )
+
+def _render_start_date(field_name: str, field_value: Any, field_info: dict):
+    """Render the start date, falling back to today."""
+    if not field_value:
+        date_value = date.today()
+    elif isinstance(field_value, str):
+        try:
+            date_value = date.fromisoformat(field_value)
+        except ValueError:
+            date_value = date.today()
+    else:
+        date_value = field_value
+    
+    st.date_input(
+        "Start Date", 
+        value=date_value,
+        key=f"form_{field_name}",
+        disabled=True
+    )
+
+def _render_additional_notes(field_name: str, field_value: Any, field_info: dict):
+    """Render the free-form notes field."""
+    st.text_area(
+        "Additional Notes", 
+        value=field_value if field_value else "",
+        key=f"form_{field_name}",
+        disabled=True
+    )
+
+# Widget renderer for each form field, keyed by field name
+_FIELD_RENDERERS: Dict[str, Callable[[str, Any, dict], None]] = {
+    'full_name': _text_input_renderer("Full Name"),
+    'email': _text_input_renderer("Email"),
+    'age': _number_input_renderer("Age", 18, 120),
+    'occupation': _text_input_renderer("Occupation"),
+    'experience_level': _selectbox_renderer("Experience Level", EXPERIENCE_OPTIONS),
+    'preferred_language': _selectbox_renderer("Preferred Language", LANGUAGE_OPTIONS),
+    'project_interests': _render_project_interests,
+    'availability_per_week': _number_input_renderer("Availability (hours per week)", 1, 168),
+    'start_date': _render_start_date,
+    'additional_notes': _render_additional_notes,
+}
+
 def generate_form():
     """
     Generates a dynamic form based on the Pydantic model and current state.
@@ -287,9 +427,11 @@ def generate_form():
     form_state = StateManager.get_form_state()
     
     # Get form fields from Pydantic model
-    form_schema = UserFormData.model_json_schema()
-    properties = form_schema.get('properties', {})
-    required_fields = form_schema.get('required', [])
+    properties, required_fields = get_form_schema()
+    
+    # Read the per-field status once rather than for every field
+    completed_fields = form_state.get('completed_fields', ())
+    current_field = form_state.get('current_field')
     
     # Create a form
     with st.form(key="user_form"):
@@ -304,11 +446,11 @@ def generate_form():
             required_label = " *" if is_required else ""
             
             # Style based on completion status
-            is_completed = field_name in form_state.get('completed_fields', [])
+            is_completed = field_name in completed_fields
             field_style = "" if is_completed else "field-incomplete"
             
             # Check if current field is being processed
-            is_current = field_name == form_state.get('current_field')
+            is_current = field_name == current_field
             if is_current:
                 field_style += " field-current"
             
@@ -316,100 +458,9 @@ def generate_form():
             st.write(f"### {field_name.replace('_', ' ').title()}{required_label}")
             st.write(f"<small>{field_description}</small>", unsafe_allow_html=True)
             
-            if field_name == 'full_name':
-                st.text_input(
-                    "Full Name", 
-                    value=field_value if field_value else "",
-                    key=f"form_{field_name}",
-                    disabled=True
-                )
-            elif field_name == 'email':
-                st.text_input(
-                    "Email", 
-                    value=field_value if field_value else "",
-                    key=f"form_{field_name}",
-                    disabled=True
-                )
-            elif field_name == 'age':
-                st.number_input(
-                    "Age", 
-                    min_value=18, 
-                    max_value=120,
-                    value=field_value if field_value else 18,
-                    key=f"form_{field_name}",
-                    disabled=True
-                )
-            elif field_name == 'occupation':
-                st.text_input(
-                    "Occupation", 
-                    value=field_value if field_value else "",
-                    key=f"form_{field_name}",
-                    disabled=True
-                )
-            elif field_name == 'experience_level':
-                options = field_info.get('enum', ["Beginner", "Intermediate", "Advanced", "Expert"])
-                st.selectbox(
-                    "Experience Level", 
-                    options=options,
-                    index=options.index(field_value) if field_value in options else 0,
-                    key=f"form_{field_name}",
-                    disabled=True
-                )
-            elif field_name == 'preferred_language':
-                options = field_info.get('enum', ["Python", "JavaScript", "Java", "C++", "Go", "Rust", "Other"])
-                st.selectbox(
-                    "Preferred Language", 
-                    options=options,
-                    index=options.index(field_value) if field_value in options else 0,
-                    key=f"form_{field_name}",
-                    disabled=True
-                )
-            elif field_name == 'project_interests':
-                if field_value and isinstance(field_value, list):
-                    interests_text = ", ".join(field_value)
-                else:
-                    interests_text = ""
-                st.text_area(
-                    "Project Interests", 
-                    value=interests_text,
-                    key=f"form_{field_name}",
-                    disabled=True,
-                    help="Enter interests separated by commas"
-                )
-            elif field_name == 'availability_per_week':
-                st.number_input(
-                    "Availability (hours per week)", 
-                    min_value=1, 
-                    max_value=168,
-                    value=field_value if field_value else 1,
-                    key=f"form_{field_name}",
-                    disabled=True
-                )
-            elif field_name == 'start_date':
-                if field_value:
-                    if isinstance(field_value, str):
-                        try:
-                            date_value = datetime.strptime(field_value, "%Y-%m-%d").date()
-                        except ValueError:
-                            date_value = datetime.now().date()
-                    else:
-                        date_value = field_value
-                else:
-                    date_value = datetime.now().date()
-                
-                st.date_input(
-                    "Start Date", 
-                    value=date_value,
-                    key=f"form_{field_name}",
-                    disabled=True
-                )
-            elif field_name == 'additional_notes':
-                st.text_area(
-                    "Additional Notes", 
-                    value=field_value if field_value else "",
-                    key=f"form_{field_name}",
-                    disabled=True
-                )
+            renderer = _FIELD_RENDERERS.get(field_name)
+            if renderer:
+                renderer(field_name, field_value, field_info)
             
             # Add some spacing between fields
             st.write("")
@@ -425,43 +476,68 @@ def generate_form():
         st.write("### Form Data (JSON Output)")
         st.json(form_data)
 
+def get_selected_device_index() -> Optional[int]:
+    """Returns the selected microphone index, or None for the default device."""
+    device_index = st.session_state.get('selected_audio_device', None)
+    return None if device_index == "default" else device_index
+
+def recalibrate_microphone():
+    """Re-measures ambient noise on the selected microphone."""
+    try:
+        get_audio_processor().calibrate(get_selected_device_index())
+    except Exception as e:
+        StateManager.add_message("error", f"⚠️ Error calibrating microphone: {str(e)}")
+
 def handle_voice_input():
     """Handles voice input if the listening state is active."""
-    if StateManager.is_listening():
-        try:
-            # Get the selected device index from session state
-            device_index = st.session_state.get('selected_audio_device', None)
-            if device_index == "default":
-                device_index = None
-                
-            # Capture and transcribe audio
-            success, text, error = audio_processor.capture_and_transcribe(
-                device_index=device_index
-            )
-            
-            # Update listening state
-            StateManager.set_listening_state(False)
+    if not StateManager.is_listening():
+        return
+    
+    future = st.session_state.get('transcription_future')
+    if future is None:
+        # Capture and transcribe audio in the background; poll_transcription waits for it
+        st.session_state.transcription_future = get_audio_processor().submit_capture_and_transcribe(
+            device_index=get_selected_device_index()
+        )
+        return
+    
+    if not future.done():
+        return
+    
+    st.session_state.transcription_future = None
+    try:
+        success, text, error = future.result()
+        
+        # Update listening state
+        StateManager.set_listening_state(False)
+        
+        if success and text:
+            # Process the transcribed text
+            process_text_input(text)
+        elif error:
+            # Create a more visible error message based on error type
+            if "NO SPEECH DETECTED" in error:
+                error_msg = f"⚠️ {error}"
+            else:
+                error_msg = f"⚠️ Voice input error: {error}"
             
-            if success and text:
-                # Process the transcribed text
-                process_text_input(text)
-            elif error:
-                # Create a more visible error message based on error type
-                if "NO SPEECH DETECTED" in error:
-                    error_msg = f"⚠️ {error}"
-                else:
-                    error_msg = f"⚠️ Voice input error: {error}"
-                
-                # Add error message to chat with error role
-                StateManager.add_message("error", error_msg)
-                
-        except Exception as e:
-            # Handle any unexpected errors during voice processing
-            error_msg = f"⚠️ Error with voice input: {str(e)}"
+            # Add error message to chat with error role
             StateManager.add_message("error", error_msg)
-            StateManager.set_listening_state(False)
             
-        # Force app to refresh
+    except Exception as e:
+        # Handle any unexpected errors during voice processing
+        error_msg = f"⚠️ Error with voice input: {str(e)}"
+        StateManager.add_message("error", error_msg)
+        StateManager.set_listening_state(False)
+
+@st.fragment(run_every=TRANSCRIPTION_POLL_SECONDS)
+def poll_transcription():
+    """
+    Watches the background transcription from a fragment, so only this
+    fragment reruns while recording; the whole app reruns once it finishes.
+    """
+    future = st.session_state.get('transcription_future')
+    if future is None or future.done():
         st.rerun()
 
 def process_text_input(text: str):
@@ -480,62 +556,68 @@ def process_text_input(text: str):
     # Get current LangGraph state
     langgraph_state = st.session_state.get('langgraph_state', {})
     
+    # Messages already in the workflow; an uninitialized workflow starts a fresh list
+    previous_count = len(langgraph_state.get('messages', ())) if langgraph_state.get('initialized') else 0
+    
+    # Imported on first use so the workflow and LLM SDKs stay off the import path of main.py
+    from langgraph_flow.graph import process_user_input
+    
     # Process the input through the workflow
     updated_state = process_user_input(langgraph_state, text)
     
     # Store the updated state
     st.session_state.langgraph_state = updated_state
     
-    # Update the StateManager with field values and state
-    if 'field_values' in updated_state:
-        for field, value in updated_state['field_values'].items():
-            StateManager.set_field_value(field, value)
-    
-    if 'current_field' in updated_state:
-        StateManager.set_current_field(updated_state['current_field'])
-    
-    # Update form state
+    # Read everything needed from the workflow state in one pass
+    get = updated_state.get
+    field_values = get('field_values') or {}
+    new_messages = get('messages', [])
     form_state_updates = {
-        'current_field': updated_state.get('current_field', ''),
-        'confirmation_state': updated_state.get('confirmation_state', False),
-        'extraction_attempts': updated_state.get('extraction_attempts', 0),
-        'is_complete': updated_state.get('is_complete', False)
+        'current_field': get('current_field', ''),
+        'confirmation_state': get('confirmation_state', False),
+        'extraction_attempts': get('extraction_attempts', 0),
+        'is_complete': get('is_complete', False)
     }
+    
+    # Update the StateManager with field values and state
+    for field, value in field_values.items():
+        StateManager.set_field_value(field, value)
+    
+    # Update form state (this also covers the current field and its counters)
     StateManager.update_form_state(form_state_updates)
     
-    # Add assistant messages to chat
-    new_messages = updated_state.get('messages', [])
-    if new_messages:
-        # Just add the last assistant message that wasn't added yet
-        current_messages = StateManager.get_chat_history()
-        current_message_contents = [m['content'] for m in current_messages]
-        
-        for message in reversed(new_messages):
-            if message['role'] == 'assistant' and message['content'] not in current_message_contents:
-                StateManager.add_message("assistant", message['content'])
-                break
+    # Add the assistant messages produced by this turn to chat
+    for message in new_messages[previous_count:]:
+        if message['role'] == 'assistant':
+            StateManager.add_message("assistant", message['content'])
 
 def main():
     """Main application function."""
+    _inject_css()
+    
     # Initialize the session state
     StateManager.initialize_state()
     
+    # Greet before anything renders so the first run needs no rerun
+    if not st.session_state.chat_messages:
+        from langgraph_flow.graph import get_initial_greeting
+        initial_state = get_initial_greeting()
+        
+        # Store the initial state
+        st.session_state.langgraph_state = initial_state
+        
+        # Add the greeting message
+        if 'messages' in initial_state and initial_state['messages']:
+            for message in initial_state['messages']:
+                if message['role'] == 'assistant':
+                    StateManager.add_message('assistant', message['content'])
+    
     # Add an audio device selector in the sidebar
     st.sidebar.title("Audio Settings")
     
     try:
-        # Get available audio devices
-        audio_devices = audio_processor.get_available_devices()
-        
-        # Create a list of options for the selectbox
-        device_options = [{"label": "Default Microphone", "value": "default"}]
-        device_options.extend([
-            {"label": f"{device['name']}", "value": device['index']}
-            for device in audio_devices
-        ])
-        
-        # Create a dictionary mapping labels to values for easier lookup
-        device_map = {item["label"]: item["value"] for item in device_options}
+        # Get the cached device labels and label-to-value mapping
+        device_labels, device_map = get_device_options()
         
         # Initialize selected device in session state if not present
         if 'selected_audio_device' not in st.session_state:
@@ -544,7 +626,7 @@ def main():
         # Display the dropdown for device selection
         selected_device_label = st.sidebar.selectbox(
             "Select Microphone Device",
-            options=[item["label"] for item in device_options],
+            options=device_labels,
             index=0,
             key="audio_device_selector"
         )
@@ -552,6 +634,12 @@ def main():
         # Update the selected device in session state when changed
         st.session_state.selected_audio_device = device_map[selected_device_label]
         
+        # Re-enumerate devices only when asked, e.g. after plugging in a microphone
+        st.sidebar.button("Refresh Devices", on_click=refresh_devices)
+        
+        # Noise is measured once per device; recalibrate after the room gets louder or quieter
+        st.sidebar.button("Recalibrate Microphone", on_click=recalibrate_microphone)
+        
         # Add a help text
         st.sidebar.info("If voice input isn't working, try selecting a different microphone device.")
     
@@ -563,6 +651,10 @@ def main():
     # Handle voice input if in listening state
     handle_voice_input()
     
+    # Keep polling while a transcription is running in the background
+    if st.session_state.get('transcription_future') is not None:
+        poll_transcription()
+    
     # Generate the dynamic form
     generate_form()
     
@@ -571,27 +663,9 @@ def main():
         user_input = st.session_state.user_text_input
         if user_input:
             process_text_input(user_input)
-            # We'll rely on Streamlit's automatic form reset behavior
-            st.rerun()
     
     # Render the chat interface with the callback
     render_chat_interface(on_submit=on_text_input_submit)
-    
-    # Initialize with greeting if no messages yet
-    if not st.session_state.chat_messages:
-        initial_state = get_initial_greeting()
-        
-        # Store the initial state
-        st.session_state.langgraph_state = initial_state
-        
-        # Add the greeting message
-        if 'messages' in initial_state and initial_state['messages']:
-            for message in initial_state['messages']:
-                if message['role'] == 'assistant':
-                    StateManager.add_message('assistant', message['content'])
-        
-        # Force refresh
-        st.rerun()
         
 if __name__ == "__main__":
     main()
\ No newline at end of file
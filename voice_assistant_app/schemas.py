@@ -1,7 +1,11 @@
-from typing import List, Optional, Literal
-from pydantic import BaseModel, Field, validator
+from typing import Annotated, Any, List, Optional, Literal, Set
+from pydantic import BaseModel, Field, StringConstraints, field_validator
 from datetime import date
 
+# Email format checked by pydantic-core's linear-time regex engine
+EMAIL_PATTERN = r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$"
+EmailAddress = Annotated[str, StringConstraints(pattern=EMAIL_PATTERN)]
+
 class UserFormData(BaseModel):
     """Pydantic model defining the form fields and validation rules."""
     
@@ -12,10 +16,9 @@ class UserFormData(BaseModel):
         max_length=100
     )
     
-    email: str = Field(
+    email: EmailAddress = Field(
         ..., 
-        description="User's email address",
-        pattern=r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$"
+        description="User's email address"
     )
     
     age: int = Field(
@@ -67,12 +70,12 @@ class UserFormData(BaseModel):
         max_length=500
     )
     
-    @validator('project_interests')
+    @field_validator('project_interests')
+    @classmethod
     def validate_project_interests(cls, v):
         """Ensure each project interest has a reasonable length."""
-        for interest in v:
-            if len(interest) < 2 or len(interest) > 100:
-                raise ValueError("Each project interest must be between 2 and 100 characters")
+        if any(not 2 <= len(interest) <= 100 for interest in v):
+            raise ValueError("Each project interest must be between 2 and 100 characters")
         return v
     
     class Config:
@@ -101,9 +104,9 @@ class FormState(BaseModel):
         description="The field currently being populated"
     )
     
-    completed_fields: List[str] = Field(
-        default_factory=list,
-        description="List of fields that have been completed"
+    completed_fields: Set[str] = Field(
+        default_factory=set,
+        description="Set of fields that have been completed"
     )
     
     field_values: dict = Field(
@@ -124,4 +127,28 @@ class FormState(BaseModel):
     is_complete: bool = Field(
         default=False,
         description="Whether all required fields are complete"
+    )
+
+
+class ExtractionSchema(BaseModel):
+    """Structured output returned by the LLM for intent and value extraction."""
+    
+    intent: Literal["provide_value", "confirm", "deny", "request_help", "request_skip", "other"] = Field(
+        ...,
+        description="The user's intent for the current field"
+    )
+    
+    extracted_value: Any = Field(
+        default=None,
+        description="The extracted value that matches the field type requirements"
+    )
+    
+    confidence: float = Field(
+        default=0.0,
+        description="Confidence in the extraction, between 0 and 1"
+    )
+    
+    reasoning: str = Field(
+        default="",
+        description="Brief explanation of the extraction logic"
     )
\ No newline at end of file
@@ -0,0 +1,67 @@
+from unittest import mock
+
+from langgraph_flow import nodes
+from langgraph_flow.graph import get_initial_greeting, process_user_input
+
+# What the user says for each field, in form order
+ANSWERS = {
+    "full_name": "Jane Doe",
+    "email": "jane.doe@example.com",
+    "age": "30",
+    "occupation": "Software Developer",
+    "experience_level": "Intermediate",
+    "preferred_language": "Python",
+    "project_interests": "web dev and ML; games",
+    "availability_per_week": "20",
+    "start_date": "2025-06-01",
+    "additional_notes": "Flexible hours please",
+}
+
+def _fake_extraction(user_input, field_name, **kwargs):
+    """Stands in for the LLM, returning the spoken text as the field value."""
+    return {
+        "intent": "provide_value",
+        "extracted_value": user_input,
+        "confidence": 1.0,
+        "reasoning": "test stub"
+    }
+
+def test_form_runs_from_start_to_finish():
+    with mock.patch.object(nodes.llm_provider, "extract_intent_and_value", side_effect=_fake_extraction):
+        state = get_initial_greeting()
+        for field, answer in ANSWERS.items():
+            assert state["current_field"] == field
+            state = process_user_input(state, answer)
+            assert state["confirmation_state"], state["messages"][-1]["content"]
+            state = process_user_input(state, "yes")
+    
+    assert state["is_complete"]
+    assert state["field_values"]["age"] == 30
+    assert state["field_values"]["availability_per_week"] == 20
+    assert state["field_values"]["project_interests"] == ["web dev", "ML", "games"]
+    assert not any("I'm having trouble" in m["content"] for m in state["messages"])
+
+def test_confirmation_prompt_shows_the_value_that_is_saved():
+    state = get_initial_greeting()
+    state.update(current_field="project_interests", extraction_success=True,
+                 extraction_result={"intent": "provide_value"},
+                 current_extracted_value="web dev and ML; games")
+    state = nodes.input_validation_node(state)
+    state = nodes.field_mapping_node(state)
+    assert state["messages"][-1]["content"].endswith("is: web dev, ML, games. Is that correct?")
+    
+    state["extraction_result"] = {"intent": "confirm"}
+    state = nodes.field_mapping_node(state)
+    assert state["field_values"]["project_interests"] == ["web dev", "ML", "games"]
+
+def test_spoken_interests_split_into_items_before_validation():
+    assert nodes._split_csv("web dev and ML; games") == ["web dev", "ML", "games"]
+    assert nodes._split_csv("android, branding") == ["android", "branding"]
+    
+    state = get_initial_greeting()
+    state.update(current_field="project_interests", extraction_success=True,
+                 extraction_result={"intent": "provide_value"},
+                 current_extracted_value="web dev and ML; games")
+    state = nodes.input_validation_node(state)
+    assert state["validation_success"], state["validation_error"]
+    assert state["current_extracted_value"] == ["web dev", "ML", "games"]
\ No newline at end of file
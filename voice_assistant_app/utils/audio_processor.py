@@ -1,50 +1,215 @@
 import speech_recognition as sr
+import atexit
+import httpx
+import importlib.util
+import io
+import json
 import logging
-from typing import Tuple, Optional, List, Dict
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Tuple, Optional, List, Dict
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+try:
+    # speech_recognition 3.11+ builds the request URL, filling in its default key
+    from speech_recognition.recognizers.google import create_request_builder
+except ImportError:
+    create_request_builder = None
+
+# Logging is configured by the application entrypoint (main.py)
 logger = logging.getLogger(__name__)
 
+# Sample rate both transcription backends work at; higher rates only add bytes
+ASR_SAMPLE_RATE = 16000
+MIC_CHUNK_SIZE = 1024
+
+# Google Web Speech endpoint
+GOOGLE_SPEECH_URL = "https://www.google.com/speech-api/v2/recognize"
+GOOGLE_SPEECH_TIMEOUT = 10
+
+# WebRTC VAD gate used when webrtcvad is installed
+VAD_AGGRESSIVENESS = 2
+VAD_FRAME_MS = 30
+VAD_LOOKBACK_MS = 300
+VAD_SAMPLE_RATES = (8000, 16000, 32000, 48000)
+MAX_PHRASE_SECONDS = 15
+
+# Local Whisper model used when faster-whisper is installed
+WHISPER_MODEL_SIZE = "base"
+WHISPER_BATCH_SIZE = 8
+
+# Seconds of ambient audio sampled when calibrating a microphone
+CALIBRATION_SECONDS = 1.0
+
+# Seconds a device lookup waits for the background probe before giving up
+DEVICE_PROBE_TIMEOUT = 3.0
+
+@lru_cache(maxsize=1)
+def _get_speech_client() -> httpx.Client:
+    """Shared keep-alive client so Google requests reuse one TCP/TLS connection."""
+    return httpx.Client(timeout=GOOGLE_SPEECH_TIMEOUT)
+
+# Serializes model loading so a warm-up and the first capture cannot both load it
+_WHISPER_LOCK = threading.Lock()
+
+# Set when the model fails to load, so later turns go straight to Google
+_whisper_load_error: Optional[Exception] = None
+
+@lru_cache(maxsize=1)
+def _load_whisper_pipeline() -> Tuple[Any, bool]:
+    """
+    Load the faster-whisper model once per process, int8-quantized for CPU.
+    
+    The model is wrapped in a batched pipeline when faster-whisper provides one;
+    it splits the audio on voice activity and decodes the segments together
+    instead of one after another.
+    
+    Returns:
+        Tuple of (model or pipeline, whether it is batched)
+    """
+    from faster_whisper import WhisperModel
+    logger.info("Loading faster-whisper model '%s' (int8)", WHISPER_MODEL_SIZE)
+    model = WhisperModel(WHISPER_MODEL_SIZE, device="cpu", compute_type="int8")
+    try:
+        from faster_whisper import BatchedInferencePipeline
+    except ImportError:
+        # Releases before 1.1 only offer sequential decoding
+        return model, False
+    return BatchedInferencePipeline(model=model), True
+
+def _get_whisper_pipeline() -> Tuple[Any, bool]:
+    """
+    Return the shared Whisper pipeline, loading it under the lock on first use.
+    A failed load is remembered and re-raised instead of retried.
+    """
+    global _whisper_load_error
+    with _WHISPER_LOCK:
+        if _whisper_load_error is not None:
+            raise RuntimeError(f"faster-whisper failed to load: {_whisper_load_error}")
+        try:
+            return _load_whisper_pipeline()
+        except Exception as e:
+            _whisper_load_error = e
+            raise
+
+# User-facing messages for the expected capture failures
+NO_SPEECH_ERROR = "🔴 NO SPEECH DETECTED 🔴 PLEASE TRY SPEAKING AGAIN OR USE TEXT INPUT INSTEAD"
+UNCLEAR_SPEECH_ERROR = "YOUR SPEECH WASN'T CLEAR. PLEASE TRY AGAIN WITH A CLEARER VOICE."
+SERVICE_UNAVAILABLE_ERROR = "SPEECH RECOGNITION SERVICE UNAVAILABLE. PLEASE USE TEXT INPUT INSTEAD."
+
 class AudioProcessor:
     """
     Handles voice input capture and transcription.
     """
     
-    def __init__(self):
-        """Initialize the speech recognizer."""
+    def __init__(self, pause_threshold: float = 0.3, non_speaking_duration: float = 0.3, phrase_threshold: float = 0.2):
+        """
+        Initialize the speech recognizer.
+        
+        Args:
+            pause_threshold: Seconds of trailing silence that end an utterance
+            non_speaking_duration: Seconds of silence kept around the recording
+            phrase_threshold: Minimum seconds of speech counted as a phrase
+        
+        The defaults favour a quick end of turn; relax them in noisy rooms or for
+        speakers who pause mid-sentence. pause_threshold must not be smaller than
+        non_speaking_duration.
+        """
         self.recognizer = sr.Recognizer()
         self.recognizer.dynamic_energy_threshold = True
         self.recognizer.energy_threshold = 300
+        self.recognizer.pause_threshold = pause_threshold
+        self.recognizer.non_speaking_duration = non_speaking_duration
+        self.recognizer.phrase_threshold = phrase_threshold
         self._available_devices = None
+        self._devices_ready = threading.Event()
+        # Guards the probe result; each probe carries a generation so a stale one is dropped
+        self._devices_lock = threading.Lock()
+        self._probe_generation = 0
+        # Enumerate input devices in the background right away
+        self._start_device_probe()
+        # ASR_BACKEND selects "whisper" (on-device, the default) or "google";
+        # whisper needs faster-whisper installed and falls back to Google otherwise
+        backend = os.environ.get("ASR_BACKEND", "whisper").lower()
+        self._use_whisper = backend == "whisper" and importlib.util.find_spec("faster_whisper") is not None
+        # Google Web Speech key from GOOGLE_SPEECH_API_KEY; without one speech_recognition
+        # supplies its default. Requests reuse one keep-alive connection when the
+        # installed speech_recognition can build the request URL for us.
+        self._google_api_key = os.environ.get("GOOGLE_SPEECH_API_KEY")
+        self._google_url = None
+        if create_request_builder is not None:
+            self._google_url = create_request_builder(endpoint=GOOGLE_SPEECH_URL, key=self._google_api_key).build_url()
+        # Opened microphone streams, kept per device so PortAudio is set up once
+        self._mic_cache: Dict[Optional[int], sr.Microphone] = {}
+        self._mic_lock = threading.Lock()
+        # In-process FLAC encoding for Google uploads, if available
+        self._use_soundfile = importlib.util.find_spec("soundfile") is not None
+        # Voice activity detector that gates capture on voiced frames, if available
+        self._vad = None
+        if importlib.util.find_spec("webrtcvad") is not None:
+            import webrtcvad
+            self._vad = webrtcvad.Vad(VAD_AGGRESSIVENESS)
+        # Devices whose ambient noise level has been measured
+        self._calibrated = set()
+        # Single recording worker so captures run off the caller's thread, one at a time
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio-capture")
+        self._warm = False
+        atexit.register(self.close)
         
     def get_available_devices(self) -> List[Dict[str, any]]:
         """
         Get a list of available audio input devices.
         
+        Waits up to DEVICE_PROBE_TIMEOUT seconds for the background probe and
+        falls back to the last known list (or none) if it has not finished.
+        
         Returns:
             List of dictionaries containing device information
         """
-        if self._available_devices is None:
-            try:
-                # Get list of microphone names
-                mic_names = sr.Microphone.list_microphone_names()
-                
-                # Create list of device dictionaries
-                self._available_devices = [
-                    {"index": i, "name": name} 
-                    for i, name in enumerate(mic_names)
-                ]
-                
-                # If no devices found, return an empty list
-                if not self._available_devices:
-                    logger.warning("No microphone devices found")
-                    self._available_devices = []
-            except Exception as e:
-                logger.error(f"Error getting microphone list: {e}")
-                self._available_devices = []
-                
-        return self._available_devices
+        if not self._devices_ready.wait(DEVICE_PROBE_TIMEOUT):
+            logger.warning("Microphone enumeration still running, using the last known device list")
+        with self._devices_lock:
+            return list(self._available_devices or [])
+    
+    def refresh_devices(self):
+        """Re-enumerate devices in the background; the next lookup waits for the new list."""
+        self._start_device_probe()
+    
+    def _start_device_probe(self):
+        """Enumerate microphones on a background thread."""
+        with self._devices_lock:
+            self._probe_generation += 1
+            generation = self._probe_generation
+            self._devices_ready.clear()
+        threading.Thread(target=self._probe_devices, args=(generation,), name="audio-device-probe", daemon=True).start()
+    
+    def _probe_devices(self, generation: int):
+        """Query PortAudio for microphone names and publish the result unless a newer probe started."""
+        try:
+            # Get list of microphone names
+            mic_names = sr.Microphone.list_microphone_names()
+            
+            # Create list of device dictionaries
+            devices = [
+                {"index": i, "name": name} 
+                for i, name in enumerate(mic_names)
+            ]
+            
+            # If no devices found, return an empty list
+            if not devices:
+                logger.warning("No microphone devices found")
+        except Exception as e:
+            logger.error("Error getting microphone list: %s", e)
+            devices = []
+        
+        with self._devices_lock:
+            if generation != self._probe_generation:
+                return
+            self._available_devices = devices
+            self._devices_ready.set()
     
     def capture_and_transcribe(self, timeout: int = 5, device_index: Optional[int] = None) -> Tuple[bool, Optional[str], Optional[str]]:
         """
@@ -61,33 +226,307 @@ class AudioProcessor:
             - Error message (if unsuccessful, otherwise None)
         """
         try:
-            # Use the specified device if provided, otherwise use default
-            if device_index is not None:
-                logger.info(f"Using microphone device with index {device_index}")
-                microphone = sr.Microphone(device_index=device_index)
-            else:
-                logger.info("Using default microphone device")
-                microphone = sr.Microphone()
-                
-            with microphone as source:
-                logger.info("Adjusting for ambient noise...")
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
+            # Only one capture can read from a microphone stream at a time
+            with self._mic_lock:
+                source = self._get_source(device_index)
                 
-                logger.info(f"Listening for {timeout} seconds...")
-                audio = self.recognizer.listen(source, timeout=timeout)
+                # Calibrate once per device; the dynamic threshold tracks changes afterwards
+                if device_index not in self._calibrated:
+                    self._adjust_for_noise(source, device_index)
                 
-                logger.info("Transcribing audio...")
-                text = self.recognizer.recognize_google(audio)
-                logger.info(f"Transcribed: {text}")
-                
-                return True, text, None
+                logger.info("Listening for %s seconds...", timeout)
+                if self._vad is not None and source.SAMPLE_RATE in VAD_SAMPLE_RATES and source.SAMPLE_WIDTH == 2:
+                    audio = self._listen_voiced(source, timeout)
+                else:
+                    audio = self.recognizer.listen(source, timeout=timeout)
+            
+            logger.info("Transcribing audio...")
+            text = self._transcribe(audio)
+            logger.info("Transcribed: %s", text)
+            
+            return True, text, None
                 
         except sr.WaitTimeoutError:
-            return False, None, "🔴 NO SPEECH DETECTED 🔴 PLEASE TRY SPEAKING AGAIN OR USE TEXT INPUT INSTEAD"
+            return False, None, NO_SPEECH_ERROR
         except sr.UnknownValueError:
-            return False, None, "YOUR SPEECH WASN'T CLEAR. PLEASE TRY AGAIN WITH A CLEARER VOICE."
-        except sr.RequestError as e:
-            return False, None, f"SPEECH RECOGNITION SERVICE UNAVAILABLE. PLEASE USE TEXT INPUT INSTEAD."
+            return False, None, UNCLEAR_SPEECH_ERROR
+        except sr.RequestError:
+            return False, None, SERVICE_UNAVAILABLE_ERROR
         except Exception as e:
-            logger.error(f"Unexpected error in audio processing: {e}")
-            return False, None, f"AN ERROR OCCURRED WITH SPEECH RECOGNITION: {str(e)}"
\ No newline at end of file
+            logger.error("Unexpected error in audio processing: %s", e)
+            # Reopen the device on the next call in case its stream went bad
+            self._release_source(device_index)
+            return False, None, f"AN ERROR OCCURRED WITH SPEECH RECOGNITION: {str(e)}"
+    
+    def _listen_voiced(self, source: sr.Microphone, timeout: int) -> sr.AudioData:
+        """
+        Record one utterance, keeping only the audio around voiced frames.
+        
+        Leading silence is dropped except for a short lookback, and recording
+        stops after pause_threshold seconds of unvoiced frames.
+        
+        Args:
+            source: Opened microphone stream
+            timeout: Seconds to wait for speech to start
+            
+        Returns:
+            Captured utterance
+        """
+        frame_samples = source.SAMPLE_RATE * VAD_FRAME_MS // 1000
+        frame_bytes = frame_samples * source.SAMPLE_WIDTH
+        max_silent_frames = max(1, int(self.recognizer.pause_threshold * 1000 // VAD_FRAME_MS))
+        max_frames = MAX_PHRASE_SECONDS * 1000 // VAD_FRAME_MS
+        
+        lookback = deque(maxlen=VAD_LOOKBACK_MS // VAD_FRAME_MS)
+        deadline = time.monotonic() + timeout
+        
+        # Wait for the first voiced frame; the deadline is checked before the
+        # frame length so a stream of short reads still times out
+        while True:
+            if time.monotonic() > deadline:
+                raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+            frame = source.stream.read(frame_samples)
+            if len(frame) < frame_bytes:
+                continue
+            lookback.append(frame)
+            if self._vad.is_speech(frame, source.SAMPLE_RATE):
+                break
+        
+        # Record until the speaker pauses, or the phrase runs too long
+        frames = list(lookback)
+        silent_frames = 0
+        phrase_deadline = time.monotonic() + MAX_PHRASE_SECONDS
+        while silent_frames < max_silent_frames and len(frames) < max_frames and time.monotonic() < phrase_deadline:
+            frame = source.stream.read(frame_samples)
+            if len(frame) < frame_bytes:
+                continue
+            frames.append(frame)
+            silent_frames = 0 if self._vad.is_speech(frame, source.SAMPLE_RATE) else silent_frames + 1
+        
+        return sr.AudioData(b"".join(frames), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+    
+    def warm_up(self):
+        """
+        Load the local Whisper model on a background thread and run it on 100 ms of
+        silence, so a capture that is already recording does not wait for the load.
+        Does nothing for the Google backend, which has no local state to prepare.
+        """
+        if self._warm or not self._use_whisper or _whisper_load_error is not None:
+            return
+        self._warm = True
+        threading.Thread(target=self._warm_up, name="asr-warmup", daemon=True).start()
+    
+    def _warm_up(self):
+        """Run one throwaway local transcription, ignoring its result."""
+        silence = sr.AudioData(b"\x00" * (ASR_SAMPLE_RATE // 10 * 2), ASR_SAMPLE_RATE, 2)
+        try:
+            self._transcribe_local(silence)
+        except sr.UnknownValueError:
+            # Silence is expected to come back unrecognized
+            pass
+        except Exception as e:
+            logger.warning("Whisper warm-up failed: %s", e)
+            return
+        logger.info("Speech recognizer warmed up")
+    
+    def submit_capture_and_transcribe(self, timeout: int = 5, device_index: Optional[int] = None) -> Future:
+        """
+        Run capture_and_transcribe on the recording worker.
+        
+        Args:
+            timeout: Number of seconds to listen for
+            device_index: Index of the microphone device to use (None for default)
+            
+        Returns:
+            Future resolving to the same tuple as capture_and_transcribe
+        """
+        # Load the local model while the first capture is still recording
+        self.warm_up()
+        return self._pool.submit(self.capture_and_transcribe, timeout=timeout, device_index=device_index)
+    
+    def calibrate(self, device_index: Optional[int] = None):
+        """
+        Measure the ambient noise level for a device and reset the energy threshold.
+        
+        Args:
+            device_index: Index of the microphone device to use (None for default)
+        """
+        with self._mic_lock:
+            self._adjust_for_noise(self._get_source(device_index), device_index)
+    
+    def _adjust_for_noise(self, source: sr.Microphone, device_index: Optional[int]):
+        """Run ambient noise calibration on an opened stream and record the device as calibrated."""
+        logger.info("Adjusting for ambient noise...")
+        self.recognizer.adjust_for_ambient_noise(source, duration=CALIBRATION_SECONDS)
+        self._calibrated.add(device_index)
+        logger.info("Energy threshold set to %.0f", self.recognizer.energy_threshold)
+    
+    def _get_source(self, device_index: Optional[int]) -> sr.Microphone:
+        """
+        Get an opened microphone stream for a device, opening it on first use.
+        
+        Args:
+            device_index: Index of the microphone device to use (None for default)
+            
+        Returns:
+            Microphone whose audio stream is ready for listening
+        """
+        source = self._mic_cache.get(device_index)
+        if source is None:
+            # Use the specified device if provided, otherwise use default
+            if device_index is not None:
+                logger.info("Using microphone device with index %s", device_index)
+            else:
+                logger.info("Using default microphone device")
+            try:
+                source = sr.Microphone(
+                    device_index=device_index,
+                    sample_rate=ASR_SAMPLE_RATE,
+                    chunk_size=MIC_CHUNK_SIZE
+                ).__enter__()
+            except Exception as e:
+                # Some devices only open at their native rate; audio is resampled before transcription
+                logger.info("16 kHz capture unavailable, using native sample rate: %s", e)
+                source = sr.Microphone(device_index=device_index).__enter__()
+            self._mic_cache[device_index] = source
+        return source
+    
+    def _release_source(self, device_index: Optional[int]):
+        """Close the cached stream for a device, if one is open."""
+        with self._mic_lock:
+            source = self._mic_cache.pop(device_index, None)
+        if source is not None:
+            try:
+                source.__exit__(None, None, None)
+            except Exception as e:
+                logger.warning("Error closing microphone %s: %s", device_index, e)
+    
+    def close(self):
+        """Stop the recording worker and close all cached microphone streams."""
+        self._pool.shutdown(wait=False)
+        for device_index in list(self._mic_cache):
+            self._release_source(device_index)
+    
+    def _transcribe(self, audio: sr.AudioData) -> str:
+        """
+        Transcribe captured audio with the configured backend.
+        
+        Args:
+            audio: Audio captured from the microphone
+            
+        Returns:
+            Transcribed text
+        """
+        if self._use_whisper and _whisper_load_error is None:
+            try:
+                return self._transcribe_local(audio)
+            except sr.UnknownValueError:
+                raise
+            except Exception as e:
+                logger.warning("Local transcription failed, falling back to Google: %s", e)
+        
+        # Upload 16-bit 16 kHz audio even when the device captured at a higher rate
+        if audio.sample_rate > ASR_SAMPLE_RATE or audio.sample_width != 2:
+            audio = sr.AudioData(
+                audio.get_raw_data(convert_rate=ASR_SAMPLE_RATE, convert_width=2),
+                ASR_SAMPLE_RATE,
+                2
+            )
+        if self._google_url is None:
+            return self.recognizer.recognize_google(audio, key=self._google_api_key)
+        return self._recognize_google(audio)
+    
+    def _encode_flac(self, audio: sr.AudioData, rate: int) -> bytes:
+        """
+        Encode audio as 16-bit FLAC for upload.
+        
+        speech_recognition shells out to the flac binary at its highest
+        compression level; libsndfile (soundfile 0.12+) encodes in-process at
+        the fastest level.
+        
+        Args:
+            audio: Audio captured from the microphone
+            rate: Sample rate to encode at
+            
+        Returns:
+            FLAC file contents
+        """
+        if not self._use_soundfile:
+            return audio.get_flac_data(convert_rate=rate, convert_width=2)
+        
+        import numpy as np
+        import soundfile as sf
+        
+        samples = np.frombuffer(audio.get_raw_data(convert_rate=rate, convert_width=2), dtype=np.int16)
+        buffer = io.BytesIO()
+        try:
+            sf.write(buffer, samples, rate, format="FLAC", subtype="PCM_16", compression_level=0.0)
+        except TypeError as e:
+            # compression_level needs soundfile 0.12+; use the flac binary from now on
+            logger.warning("In-process FLAC encoding unavailable, using speech_recognition's encoder: %s", e)
+            self._use_soundfile = False
+            return audio.get_flac_data(convert_rate=rate, convert_width=2)
+        return buffer.getvalue()
+    
+    def _recognize_google(self, audio: sr.AudioData) -> str:
+        """
+        Transcribe audio with the Google Web Speech API over the shared connection.
+        
+        Mirrors speech_recognition's recognize_google (en-US, same key), which
+        opens a new connection on every call.
+        
+        Args:
+            audio: Audio captured from the microphone
+            
+        Returns:
+            Best transcript
+        """
+        rate = audio.sample_rate if audio.sample_rate >= 8000 else 8000
+        flac_data = self._encode_flac(audio, rate)
+        
+        try:
+            response = _get_speech_client().post(
+                self._google_url,
+                content=flac_data,
+                headers={"Content-Type": f"audio/x-flac; rate={rate}"}
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            raise sr.RequestError(f"recognition request failed: {e}")
+        
+        # The response is one JSON object per line; the first ones may have empty results
+        for line in response.text.split("\n"):
+            if not line:
+                continue
+            results = json.loads(line).get("result", [])
+            if results:
+                for alternative in results[0].get("alternative", []):
+                    if "transcript" in alternative:
+                        return alternative["transcript"]
+        raise sr.UnknownValueError()
+    
+    def _transcribe_local(self, audio: sr.AudioData) -> str:
+        """
+        Transcribe captured audio on-device with faster-whisper.
+        
+        Args:
+            audio: Audio captured from the microphone
+            
+        Returns:
+            Transcribed text
+        """
+        import numpy as np
+        
+        # Whisper expects 16 kHz mono float32 samples in [-1, 1]
+        raw = audio.get_raw_data(convert_rate=ASR_SAMPLE_RATE, convert_width=2)
+        samples = np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+        
+        pipeline, batched = _get_whisper_pipeline()
+        if batched:
+            segments, _ = pipeline.transcribe(samples, language="en", beam_size=1, batch_size=WHISPER_BATCH_SIZE)
+        else:
+            segments, _ = pipeline.transcribe(samples, language="en", beam_size=1)
+        text = " ".join(segment.text.strip() for segment in segments).strip()
+        if not text:
+            raise sr.UnknownValueError()
+        return text
\ No newline at end of file
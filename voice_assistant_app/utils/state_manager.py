@@ -1,7 +1,49 @@
 import streamlit as st
+import html
+import logging
+from collections import deque
 from typing import Dict, Any, List, Optional
 from schemas import UserFormData, FormState
 
+logger = logging.getLogger(__name__)
+
+# Number of chat messages kept (and re-rendered) per session
+CHAT_HISTORY_LIMIT = 100
+
+# Fields that must be filled in before the form counts as complete
+_REQUIRED_FIELDS = frozenset(
+    name for name, field in UserFormData.model_fields.items() if field.is_required()
+)
+
+# Default form state, validated once; copies only need fresh mutable containers
+_DEFAULT_FORM_STATE = FormState().model_dump()
+
+def _new_form_state() -> Dict[str, Any]:
+    """Return a fresh copy of the default form state."""
+    return {**_DEFAULT_FORM_STATE, 'completed_fields': set(), 'field_values': {}}
+
+def build_message_html(role: str, content: str) -> str:
+    """
+    Build the styled HTML block for a chat message.
+    
+    Args:
+        role: Either 'user', 'assistant', or 'error'
+        content: The message content
+        
+    Returns:
+        HTML string with the content escaped
+    """
+    if role == 'user':
+        css_class = "user-message"
+    elif 'No speech detected' in content:
+        # Special styling for speech detection errors
+        css_class = "error-message speech-error"
+    elif role == 'error' or 'Voice input error' in content:
+        css_class = "error-message"
+    else:
+        css_class = "assistant-message"
+    return f'<div class="{css_class}">{html.escape(content)}</div>'
+
 class StateManager:
     """
     Manages the application state within the Streamlit session state.
@@ -11,10 +53,12 @@ class StateManager:
     def initialize_state():
         """Initialize all required session state variables if they don't exist."""
         if 'chat_messages' not in st.session_state:
-            st.session_state.chat_messages = []
+            st.session_state.chat_messages = deque(maxlen=CHAT_HISTORY_LIMIT)
+            # Messages pushed out of the bounded history, oldest first
+            st.session_state.chat_archive = []
             
         if 'form_state' not in st.session_state:
-            st.session_state.form_state = FormState().model_dump()
+            st.session_state.form_state = _new_form_state()
             
         if 'form_data' not in st.session_state:
             st.session_state.form_data = {}
@@ -34,12 +78,29 @@ class StateManager:
             role: Either 'user', 'assistant', or 'error'
             content: The message content
         """
-        st.session_state.chat_messages.append({"role": role, "content": content})
+        messages = st.session_state.chat_messages
+        
+        # Archive the message the deque is about to drop
+        if len(messages) == messages.maxlen:
+            evicted = messages[0]
+            st.session_state.chat_archive.append({"role": evicted['role'], "content": evicted['content']})
+        
+        # Messages never change once added, so render their HTML a single time
+        messages.append({
+            "role": role,
+            "content": content,
+            "_html": build_message_html(role, content)
+        })
     
     @staticmethod
     def get_chat_history() -> List[Dict[str, str]]:
-        """Get the current chat history."""
-        return st.session_state.chat_messages
+        """Get the most recent chat messages, at most CHAT_HISTORY_LIMIT of them."""
+        return list(st.session_state.chat_messages)
+    
+    @staticmethod
+    def get_archived_messages() -> List[Dict[str, str]]:
+        """Get the messages that have scrolled out of the chat history, oldest first."""
+        return st.session_state.chat_archive
     
     @staticmethod
     def update_form_state(updates: Dict[str, Any]):
@@ -65,22 +126,19 @@ class StateManager:
             field_name: The name of the field to update
             value: The value to set
         """
-        # Print debug info
-        print(f"Setting field value: {field_name} = {value}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Setting field value: %s = %s", field_name, value)
         
-        # Update the form data
-        if value is not None:
-            st.session_state.form_data[field_name] = value
+        session = st.session_state
+        form_state = session.form_state
         
-        # Update the completed fields in form state if not already there and value is not None
-        if field_name not in st.session_state.form_state['completed_fields'] and value is not None:
-            st.session_state.form_state['completed_fields'].append(field_name)
+        # Update the form data and mark the field completed once it has a value
+        if value is not None:
+            session.form_data[field_name] = value
+            form_state['completed_fields'].add(field_name)
         
         # Update field values in form state
-        if 'field_values' not in st.session_state.form_state:
-            st.session_state.form_state['field_values'] = {}
-            
-        st.session_state.form_state['field_values'][field_name] = value
+        form_state.setdefault('field_values', {})[field_name] = value
     
     @staticmethod
     def get_form_data() -> Dict[str, Any]:
@@ -112,14 +170,8 @@ class StateManager:
         Returns:
             Boolean indicating if the form is complete
         """
-        # Get all fields from UserFormData excluding optional ones
-        required_fields = [
-            field for field, model_field in UserFormData.__annotations__.items()
-            if not str(model_field).startswith('Optional')
-        ]
-        
         completed_fields = st.session_state.form_state['completed_fields']
-        is_complete = all(field in completed_fields for field in required_fields)
+        is_complete = _REQUIRED_FIELDS.issubset(completed_fields)
         
         st.session_state.form_state['is_complete'] = is_complete
         return is_complete
@@ -142,7 +194,8 @@ class StateManager:
     @staticmethod
     def reset_form():
         """Reset the form and chat state."""
-        st.session_state.form_state = FormState().model_dump()
+        st.session_state.form_state = _new_form_state()
         st.session_state.form_data = {}
-        st.session_state.chat_messages = []
+        st.session_state.chat_messages = deque(maxlen=CHAT_HISTORY_LIMIT)
+        st.session_state.chat_archive = []
         st.session_state.langgraph_state = {}
\ No newline at end of file